@@ -1,12 +1,59 @@
 import time
 import random
-from typing import List, Dict, Any
-from playwright.sync_api import Page
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from playwright.sync_api import Page, BrowserContext, TimeoutError as PlaywrightTimeoutError
+from .models import Job
 from .utils.config import Config
 from .utils.storage import Storage
 from .utils.logger import logger
 
 
+# Boss 直聘的聊天窗口可能有多种形式，多个候选合并为一个选择器，一次查询即可
+CHAT_INPUT_SELECTOR = ', '.join([
+    '.chat-input textarea',
+    '.message-input textarea',
+    '#chat-input',
+    'textarea.input-area'
+])
+
+SEND_BUTTON_SELECTOR = ', '.join([
+    '.btn-send',
+    '.send-btn',
+    'button:has-text("发送")'
+])
+
+
+class _GreetingVars(dict):
+    """打招呼模板变量，未知变量原样保留"""
+
+    def __missing__(self, key: str) -> str:
+        return '{' + key + '}'
+
+
+def render_greeting(template: str, job: Job) -> str:
+    """
+    渲染打招呼模板，支持变量 {position} {company}
+
+    Args:
+        template: 打招呼模板
+        job: 职位信息
+
+    Returns:
+        替换变量后的打招呼语
+    """
+    # 不含变量的模板无需格式化
+    if '{' not in template:
+        return template
+
+    variables = _GreetingVars(position=job.job_name, company=job.company)
+    try:
+        return template.format_map(variables)
+    except (ValueError, IndexError, AttributeError, TypeError):
+        # 模板中有不成对的花括号等无法格式化的内容，退回逐个替换
+        return template.replace('{position}', variables['position']).replace('{company}', variables['company'])
+
+
 class JobApplier:
     """职位投递类"""
 
@@ -15,8 +62,11 @@ class JobApplier:
         self.config = config
         self.storage = storage
         self.apply_config = config.apply
+        self.greetings = tuple(config.greetings)
+        # 并行投递的页面数，每个页面使用独立的 BrowserContext
+        self.workers = max(1, int(self.apply_config.get('workers', 1)))
 
-    def apply_jobs(self, jobs: List[Dict[str, Any]]) -> Dict[str, int]:
+    def apply_jobs(self, jobs: List[Job]) -> Dict[str, int]:
         """
         批量投递职位
 
@@ -42,141 +92,219 @@ class JobApplier:
 
         logger.info(f"今日已投递 {today_count} 个，本次最多投递 {remaining_batch} 个")
 
-        for i, job in enumerate(jobs[:remaining_batch]):
-            job_name = job.get('job_name', '')
-            company = job.get('company', '')
-
-            logger.info(f"[{i + 1}/{remaining_batch}] 投递: {job_name} - {company}")
-
-            try:
-                success = self._apply_single_job(job)
-                if success:
-                    stats['success'] += 1
-                    self.storage.add_applied_job(job['job_id'], {
-                        'job_name': job_name,
-                        'company': company,
-                        'hr_name': job.get('hr_name', ''),
-                        'salary': job.get('salary', ''),
-                        'url': job.get('url', '')
-                    })
-                    self.storage.increment_today_apply_count()
-                    logger.info(f"✓ 投递成功: {job_name}")
-                else:
+        worker_contexts = self._open_worker_contexts(min(self.workers, remaining_batch) - 1)
+        pages = [self.page] + [context.pages[0] for context in worker_contexts]
+        # 每个页面独立计算投递间隔，轮到间隔最先结束的页面投递下一个职位
+        ready_at = [0.0] * len(pages)
+        # 投递成功的记录先缓存在内存中，在投递间隔内或结束时批量写入
+        pending_records: Dict[str, Dict[str, Any]] = {}
+
+        try:
+            for i, job in enumerate(jobs[:remaining_batch]):
+                worker = min(range(len(pages)), key=ready_at.__getitem__)
+                if ready_at[worker] > time.monotonic():
+                    # 投递间隔内先写入投递记录、打开详情页，与等待重叠
+                    self._flush_applied(pending_records)
+                    self._preload_job_page(pages[worker], job)
+                    wait = ready_at[worker] - time.monotonic()
+                    if wait > 0:
+                        logger.debug(f"等待 {wait:.1f} 秒...")
+                        time.sleep(wait)
+
+                job_name = job.job_name
+                company = job.company
+
+                logger.info(f"[{i + 1}/{remaining_batch}] 投递: {job_name} - {company}")
+
+                try:
+                    success = self._apply_single_job(job, pages[worker])
+                    if success:
+                        stats['success'] += 1
+                        pending_records[job.job_id] = {
+                            'job_name': job_name,
+                            'company': company,
+                            'hr_name': job.hr_name,
+                            'salary': job.salary,
+                            'url': job.url,
+                            'apply_time': datetime.now().isoformat()
+                        }
+                        logger.info(f"✓ 投递成功: {job_name}")
+                    else:
+                        stats['failed'] += 1
+                        logger.warning(f"✗ 投递失败: {job_name}")
+                except Exception as e:
                     stats['failed'] += 1
-                    logger.warning(f"✗ 投递失败: {job_name}")
-            except Exception as e:
-                stats['failed'] += 1
-                logger.error(f"✗ 投递异常: {job_name} - {e}")
+                    logger.error(f"✗ 投递异常: {job_name} - {e}")
 
-            # 随机延迟
-            self._random_delay()
+                # 随机延迟
+                ready_at[worker] = time.monotonic() + self._random_delay()
+        finally:
+            self._flush_applied(pending_records)
+            for context in worker_contexts:
+                context.close()
 
         logger.info(f"投递完成: 成功 {stats['success']}, 失败 {stats['failed']}, 跳过 {stats['skipped']}")
         return stats
 
-    def _apply_single_job(self, job: Dict[str, Any]) -> bool:
+    def _flush_applied(self, pending_records: Dict[str, Dict[str, Any]]) -> None:
+        """
+        写入缓存的投递记录并清空缓存
+
+        Args:
+            pending_records: job_id -> 投递记录
+        """
+        if not pending_records:
+            return
+
+        self.storage.add_applied_jobs(pending_records)
+        self.storage.increment_today_apply_count(len(pending_records))
+        pending_records.clear()
+
+    def _open_worker_contexts(self, count: int) -> List[BrowserContext]:
+        """
+        创建额外的投递上下文（共享同一个浏览器进程）
+
+        Args:
+            count: 需要创建的上下文数量
+
+        Returns:
+            上下文列表，每个上下文带一个已打开的页面
+        """
+        browser = self.page.context.browser
+        if count <= 0 or browser is None:
+            return []
+
+        # 复制当前会话的 Cookie 和 UA，新上下文无需重新登录
+        storage_state = self.page.context.storage_state()
+        user_agent = self.page.evaluate('() => navigator.userAgent')
+
+        contexts = []
+        for _ in range(count):
+            context = browser.new_context(
+                storage_state=storage_state,
+                viewport=self.page.viewport_size,
+                user_agent=user_agent
+            )
+            context.new_page()
+            contexts.append(context)
+
+        logger.info(f"并行投递：共 {count + 1} 个页面")
+        return contexts
+
+    def _preload_job_page(self, page: Page, job: Job) -> None:
+        """
+        提前打开职位详情页（只浏览不操作，不影响投递间隔）
+
+        Args:
+            page: 之后执行投递的页面
+            job: 职位信息
+        """
+        url = job.url
+        if not url:
+            return
+
+        try:
+            page.goto(url)
+        except Exception as e:
+            logger.debug(f"预加载职位详情页失败: {e}")
+
+    def _apply_single_job(self, job: Job, page: Optional[Page] = None) -> bool:
         """
         投递单个职位
 
         Args:
             job: 职位信息
+            page: 执行投递的页面，默认为主页面
 
         Returns:
             是否成功
         """
-        url = job.get('url', '')
+        page = page or self.page
+        url = job.url
         if not url:
             return False
 
-        # 访问职位详情页
-        self.page.goto(url)
-        time.sleep(2)
+        # 访问职位详情页（已预加载则跳过），等待沟通按钮渲染而不是固定等待
+        if page.url != url:
+            page.goto(url)
+        try:
+            page.wait_for_selector('.btn-startchat', timeout=10000)
+        except PlaywrightTimeoutError:
+            logger.debug("未找到'立即沟通'按钮")
+            return False
 
-        # 查找"立即沟通"按钮
-        chat_btn = self.page.query_selector('.btn-startchat')
+        # 查找"立即沟通"按钮，存在性和文字一次取回
+        chat_btn = page.evaluate("""() => {
+            const btn = document.querySelector('.btn-startchat');
+            return btn ? {text: btn.innerText.trim()} : null;
+        }""")
         if not chat_btn:
             logger.debug("未找到'立即沟通'按钮")
             return False
 
         # 检查按钮状态
-        btn_text = chat_btn.inner_text().strip()
-        if '继续沟通' in btn_text:
+        if '继续沟通' in chat_btn['text']:
             logger.debug("已经沟通过，跳过")
             return False
 
-        # 点击"立即沟通"
-        chat_btn.click()
-        time.sleep(2)
+        # 点击"立即沟通"（点击需要真实鼠标事件，仍通过 Playwright 执行）
+        page.locator('.btn-startchat').first.click()
 
-        # 检查是否弹出聊天窗口或需要发送打招呼
-        success = self._send_greeting(job)
+        # 检查是否弹出聊天窗口或需要发送打招呼（发送时会等待输入框出现）
+        success = self._send_greeting(job, page)
 
         return success
 
-    def _send_greeting(self, job: Dict[str, Any]) -> bool:
+    def _send_greeting(self, job: Job, page: Optional[Page] = None) -> bool:
         """
         发送打招呼消息
 
         Args:
             job: 职位信息
+            page: 聊天所在页面，默认为主页面
 
         Returns:
             是否成功
         """
+        page = page or self.page
         # 随机选择一个打招呼模板
-        greetings = self.config.greetings
-        if not greetings:
+        if not self.greetings:
             logger.warning("未配置打招呼模板")
             return True  # 没有模板也算成功（已经点击了沟通）
 
-        greeting = random.choice(greetings)
-
         # 替换变量
-        greeting = greeting.replace('{position}', job.get('job_name', ''))
-        greeting = greeting.replace('{company}', job.get('company', ''))
-
-        # 查找输入框
-        # Boss 直聘的聊天窗口可能有多种形式
-        input_selectors = [
-            '.chat-input textarea',
-            '.message-input textarea',
-            '#chat-input',
-            'textarea.input-area'
-        ]
-
-        input_box = None
-        for selector in input_selectors:
-            input_box = self.page.query_selector(selector)
-            if input_box:
-                break
-
-        if input_box:
-            input_box.fill(greeting)
-            time.sleep(0.5)
-
-            # 查找发送按钮
-            send_selectors = [
-                '.btn-send',
-                '.send-btn',
-                'button:has-text("发送")'
-            ]
-
-            for selector in send_selectors:
-                send_btn = self.page.query_selector(selector)
-                if send_btn:
-                    send_btn.click()
-                    time.sleep(1)
-                    logger.debug(f"已发送打招呼: {greeting[:30]}...")
-                    return True
-
-        # 如果没有输入框，可能是直接进入了聊天页面
-        # 这种情况也算成功
+        greeting = render_greeting(random.choice(self.greetings), job)
+
+        # 等待输入框出现，替代点击后的固定等待
+        input_box = page.locator(CHAT_INPUT_SELECTOR).first
+        try:
+            input_box.wait_for(timeout=5000)
+        except PlaywrightTimeoutError:
+            # 如果没有输入框，可能是直接进入了聊天页面
+            # 这种情况也算成功
+            return True
+
+        input_box.fill(greeting)
+
+        # 查找发送按钮
+        send_btn = page.locator(SEND_BUTTON_SELECTOR).first
+        try:
+            send_btn.wait_for(state='visible', timeout=3000)
+        except PlaywrightTimeoutError:
+            return True
+
+        send_btn.click()
+        # 输入框被清空说明消息已发出
+        try:
+            page.wait_for_function('el => !el.value', arg=input_box.element_handle(), timeout=3000)
+        except PlaywrightTimeoutError:
+            pass
+        logger.debug(f"已发送打招呼: {greeting[:30]}...")
+
         return True
 
-    def _random_delay(self) -> None:
-        """随机延迟，模拟人工操作"""
+    def _random_delay(self) -> float:
+        """随机延迟秒数，模拟人工操作"""
         min_delay = self.apply_config.get('interval_min', 30)
         max_delay = self.apply_config.get('interval_max', 60)
-        delay = random.uniform(min_delay, max_delay)
-        logger.debug(f"等待 {delay:.1f} 秒...")
-        time.sleep(delay)
+        return random.uniform(min_delay, max_delay)
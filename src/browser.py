@@ -1,7 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
 from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page
+from pathlib import Path
 from typing import Optional
 from .utils.config import Config
 from .utils.logger import logger
+from .utils.rate_limit import TokenBucket
 
 
 # 平台域名映射
@@ -10,93 +13,237 @@ PLATFORM_DOMAINS = {
     'liepin': '.liepin.com',
 }
 
+# 默认拦截的资源类型：投递流程只依赖 HTML/XHR/CSS，图片、媒体、字体无需下载
+DEFAULT_BLOCKED_RESOURCES = ['image', 'media', 'font']
+
+# 默认访问频率：每秒 1 次页面跳转，最多连续 5 次
+DEFAULT_RATE_LIMIT = 1.0
+DEFAULT_RATE_BURST = 5
+
+
+def get_state_file(config: Config, platform: str) -> Path:
+    """会话状态文件（Cookie + localStorage）路径，按平台分离，命名规则与 Storage 一致"""
+    prefix = f"{platform}_" if platform != "boss" else ""
+    return config.base_dir / "data" / f"{prefix}storage_state.json"
+
 
 class BrowserManager:
-    """浏览器管理类（支持多平台）"""
+    """
+    浏览器管理类（支持多平台）
+
+    浏览器进程只启动一次，每次任务通过 new_page() 打开页面，
+    结束时 reset_pages() 只关闭页面、保留上下文，
+    定时任务模式下可在多次运行之间复用同一个浏览器和上下文（Cookie、连接）。
+
+    注意：Playwright 同步 API 只能在创建它的线程中使用，
+    跨次复用时所有浏览器操作都应提交到 executor 中执行。
+
+    每个平台使用各自的浏览器和上下文：不同平台的 Cookie、限流互不相关，
+    且各平台在自己的浏览器线程中并发运行；同一平台的搜索、投递页面共用一个上下文（缓存、连接）。
+    """
 
-    def __init__(self, config: Config, platform: str = "boss"):
+    __slots__ = (
+        'config', 'platform', 'log_prefix', 'playwright', 'browser', 'context', 'page',
+        'state_file', 'executor', 'rate_limiter'
+    )
+
+    def __init__(self, config: Config, platform: str = "boss", display_name: Optional[str] = None):
+        """
+        Args:
+            config: 配置对象
+            platform: 平台名称
+            display_name: 平台显示名称（取自平台类的 display_name，用于日志），未传入时使用平台名称
+        """
         self.config = config
         self.platform = platform
+        self.log_prefix = f"[{display_name or platform}]"
         self.playwright = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
-
-    def start(self, headless: bool = False) -> Page:
+        self.state_file = get_state_file(config, platform)
+        # 浏览器专用线程，保证 Playwright 始终在同一线程中调用
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"browser-{platform}")
+        # 按平台（域名）限制页面跳转频率，rate_limit 配置为 0 时不限制
+        rate = config.browser.get('rate_limit', DEFAULT_RATE_LIMIT)
+        burst = config.browser.get('rate_burst', DEFAULT_RATE_BURST)
+        self.rate_limiter: Optional[TokenBucket] = TokenBucket(rate, burst) if rate and rate > 0 else None
+
+    def start_browser(self, headless: bool = False) -> Browser:
         """
-        启动浏览器
+        启动浏览器进程（已启动则直接复用）
 
         Args:
             headless: 是否无头模式
 
         Returns:
-            Page 对象
+            Browser 对象
         """
-        platform_display = "Boss直聘" if self.platform == "boss" else "猎聘网"
-        logger.info(f"[{platform_display}] 启动浏览器...")
+        if self.browser and self.browser.is_connected():
+            return self.browser
 
-        self.playwright = sync_playwright().start()
+        logger.info(f"{self.log_prefix} 启动浏览器...")
+
+        # 浏览器断开后旧的上下文和页面已不可用
+        self.context = None
+        self.page = None
+
+        if self.playwright is None:
+            self.playwright = sync_playwright().start()
         self.browser = self.playwright.chromium.launch(
             headless=headless,
             args=['--disable-blink-features=AutomationControlled']
         )
 
+        logger.info(f"{self.log_prefix} 浏览器启动成功")
+        return self.browser
+
+    def new_session(self) -> Page:
+        """
+        在已启动的浏览器上创建新的上下文和页面
+
+        Returns:
+            Page 对象
+        """
+        if not self.browser:
+            raise RuntimeError("浏览器未启动，请先调用 start_browser()")
+
+        self.close_session()
+
+        # 有可用的会话状态时直接恢复，否则从 Cookie 文件注入
+        use_state = self._is_state_usable()
+
         # 创建上下文并设置 Cookie
         self.context = self.browser.new_context(
             viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            storage_state=str(self.state_file) if use_state else None
         )
 
-        # 设置 Cookie
-        self._set_cookies()
+        self._block_resources()
+
+        if use_state:
+            logger.info(f"{self.log_prefix} 已恢复会话状态: {self.state_file.name}")
+        else:
+            # 设置 Cookie
+            self._set_cookies()
+            self._save_state()
 
         self.page = self.context.new_page()
 
         # 设置默认超时
         self.page.set_default_timeout(30000)
 
-        logger.info(f"[{platform_display}] 浏览器启动成功")
         return self.page
 
+    def new_page(self) -> Page:
+        """
+        在保留的上下文中打开新页面；没有可复用的上下文或 Cookie 文件已更新时创建新会话
+
+        Returns:
+            Page 对象
+        """
+        if self.context is None or not self._is_state_usable():
+            return self.new_session()
+
+        self.page = self.context.new_page()
+        self.page.set_default_timeout(30000)
+        return self.page
+
+    def reset_pages(self) -> None:
+        """保存会话状态并关闭上下文中的所有页面，保留上下文供下次运行复用"""
+        if self.context:
+            self._save_state()
+            for page in list(self.context.pages):
+                page.close()
+        self.page = None
+
+    def start(self, headless: bool = False) -> Page:
+        """
+        启动浏览器并创建会话
+
+        Args:
+            headless: 是否无头模式
+
+        Returns:
+            Page 对象
+        """
+        self.start_browser(headless=headless)
+        return self.new_session()
+
     def _set_cookies(self) -> None:
         """设置 Cookie"""
-        cookie_str = self.config.get_cookie(self.platform)
         domain = PLATFORM_DOMAINS.get(self.platform, '.zhipin.com')
+        cookies = self.config.get_cookies(self.platform, domain)
 
-        if not cookie_str:
-            cookie_file = "cookie.txt" if self.platform == "boss" else f"cookie_{self.platform}.txt"
+        if not cookies:
+            cookie_file = self.config.get_cookie_path(self.platform).name
             logger.warning(f"未找到 Cookie，请确保 {cookie_file} 文件中有有效的 Cookie")
             return
 
-        cookies = []
-        for item in cookie_str.split(';'):
-            item = item.strip()
-            if '=' in item:
-                name, value = item.split('=', 1)
-                cookies.append({
-                    'name': name.strip(),
-                    'value': value.strip(),
-                    'domain': domain,
-                    'path': '/'
-                })
-
-        if cookies:
-            self.context.add_cookies(cookies)
-            logger.info(f"已设置 {len(cookies)} 个 Cookie")
+        self.context.add_cookies(cookies)
+        logger.info(f"已设置 {len(cookies)} 个 Cookie")
 
-    def close(self) -> None:
-        """关闭浏览器"""
+    def _block_resources(self) -> None:
+        """拦截配置中指定类型的资源请求"""
+        blocked = frozenset(self.config.browser.get('blocked_resources', DEFAULT_BLOCKED_RESOURCES) or [])
+        if not blocked:
+            return
+
+        def handle_route(route):
+            if route.request.resource_type in blocked:
+                route.abort()
+            else:
+                route.continue_()
+
+        self.context.route('**/*', handle_route)
+
+    def _is_state_usable(self) -> bool:
+        """会话状态文件存在且不早于 Cookie 文件（更新 Cookie 后重新注入）"""
+        if not self.state_file.exists():
+            return False
+        cookie_file = self.config.get_cookie_path(self.platform)
+        if not cookie_file.exists():
+            return True
+        return self.state_file.stat().st_mtime >= cookie_file.stat().st_mtime
+
+    def _save_state(self) -> None:
+        """保存当前上下文的会话状态"""
+        try:
+            self.state_file.parent.mkdir(exist_ok=True)
+            self.context.storage_state(path=str(self.state_file))
+        except Exception as e:
+            logger.warning(f"保存会话状态失败: {e}")
+
+    def close_session(self) -> None:
+        """关闭当前上下文和页面，保留浏览器进程"""
         if self.page:
             self.page.close()
+            self.page = None
         if self.context:
+            self._save_state()
             self.context.close()
+            self.context = None
+
+    def close(self) -> None:
+        """关闭浏览器"""
+        self.close_session()
         if self.browser:
             self.browser.close()
+            self.browser = None
         if self.playwright:
             self.playwright.stop()
+            self.playwright = None
 
         logger.info("浏览器已关闭")
 
+    def shutdown(self) -> None:
+        """在浏览器线程中关闭浏览器，并回收线程"""
+        try:
+            self.executor.submit(self.close).result()
+        finally:
+            self.executor.shutdown()
+
     def __enter__(self):
         self.start()
         return self
@@ -1,22 +1,128 @@
 import re
-from typing import List, Dict, Any, Union, Tuple, Optional
+from typing import List, Dict, Any, Union, Tuple, Optional, Set, Callable
 from datetime import datetime, timedelta
+from .models import Job
 from .utils.config import Config
 from .utils.storage import Storage
 from .utils.logger import logger
 
+try:
+    import ahocorasick
+except ImportError:  # 未安装 pyahocorasick 时退化为逐个子串匹配
+    ahocorasick = None
+
+_RE_SALARY_NUMBER = re.compile(r'\d+')
+
+
+def job_dedupe_key(job: Job) -> Any:
+    """职位去重键：优先使用 job_id，缺失时使用 (公司, 职位名, 薪资)"""
+    return job.job_id or (job.company, job.job_name, job.salary)
+
+
+def dedupe_jobs(jobs: List[Job]) -> List[Job]:
+    """职位去重，保留首次出现的顺序"""
+    unique: Dict[Any, Job] = {}
+    for job in jobs:
+        unique.setdefault(job_dedupe_key(job), job)
+    return list(unique.values())
+
+
+class KeywordMatcher:
+    """多关键词匹配器（安装 pyahocorasick 时用 Aho-Corasick 自动机一次扫描出所有命中）"""
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = frozenset(keyword.lower() for keyword in keywords if keyword)
+        self._automaton = None
+
+        if ahocorasick is not None and self.keywords:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+
+    def __bool__(self) -> bool:
+        return bool(self.keywords)
+
+    def find_all(self, text: str) -> Set[str]:
+        """返回文本中命中的所有关键词（text 需已转为小写）"""
+        if self._automaton is not None:
+            return {keyword for _, keyword in self._automaton.iter(text)}
+        return {keyword for keyword in self.keywords if keyword in text}
+
+    def find_first(self, text: str) -> Optional[str]:
+        """返回文本中第一个命中的关键词，无命中返回 None（只需判断是否命中时使用，命中即停止扫描）"""
+        if self._automaton is not None:
+            for _, keyword in self._automaton.iter(text):
+                return keyword
+            return None
+        return next((keyword for keyword in self.keywords if keyword in text), None)
+
 
 class JobFilter:
     """职位过滤器"""
 
-    def __init__(self, config: Union[Config, Dict[str, Any]], storage: Storage):
+    def __init__(
+        self,
+        config: Union[Config, Dict[str, Any]],
+        storage: Storage,
+        applied_ids: Optional[Set[str]] = None
+    ):
+        """
+        Args:
+            config: 配置对象或平台配置 dict
+            storage: 存储对象
+            applied_ids: 已投递职位 ID 集合，传入时直接查集合，否则经由 storage 查询
+        """
         self.storage = storage
+        self.applied_ids = applied_ids
         # 支持传入 Config 对象或 dict
         if isinstance(config, dict):
             self.filter_config = config.get('filter', {})
         else:
             self.filter_config = config.filter
 
+        # 关键词匹配器只构建一次，过滤时每段文本只扫描一遍
+        self._company_kw_matcher = KeywordMatcher(self.filter_config.get('company_keyword_blacklist', []))
+        self._include_matcher = KeywordMatcher(self.filter_config.get('must_include', []))
+        self._exclude_matcher = KeywordMatcher(self.filter_config.get('must_exclude', []))
+
+        # 薪资要求
+        self._min_start = self.filter_config.get('min_salary_start', 20)  # 起薪最低要求
+        self._min_max = self.filter_config.get('min_salary_max', 35)      # 最高薪资最低要求
+
+        self._refresh_snapshot()
+
+    def _refresh_snapshot(self) -> None:
+        """快照公司黑名单（存储 + 配置），逐个职位只做集合查找"""
+        self._company_bl = (
+            self.storage.get_company_blacklist() |
+            frozenset(self.filter_config.get('company_blacklist', []))
+        )
+        # 公司屏蔽判定结果（黑名单 + 公司名关键词），按公司名缓存
+        self._company_blocked: Dict[str, bool] = {}
+        # 已投递判定：传入集合时直接绑定其 __contains__，否则经由 storage（布隆过滤器）查询
+        self._is_applied: Callable[[str], bool] = (
+            self.applied_ids.__contains__ if self.applied_ids is not None else self.storage.is_job_applied
+        )
+
+    def _classify_companies(self, companies: Set[str]) -> None:
+        """
+        批量判定公司是否屏蔽，同一公司的多个职位只判定一次
+
+        Args:
+            companies: 公司名集合
+        """
+        pending = companies - self._company_blocked.keys()
+        blocked = pending & self._company_bl
+        if self._company_kw_matcher:
+            blocked |= {
+                company for company in pending - blocked
+                if self._company_kw_matcher.find_first(company.lower())
+            }
+
+        self._company_blocked.update(dict.fromkeys(pending, False))
+        self._company_blocked.update(dict.fromkeys(blocked, True))
+
     def _parse_salary(self, salary_str: str) -> Tuple[Optional[int], Optional[int]]:
         """
         解析薪资字符串，返回 (最低薪资K, 最高薪资K)
@@ -30,52 +136,41 @@ class JobFilter:
         if not salary_str:
             return None, None
 
-        # 清理字符串，提取数字
-        salary_str = salary_str.lower().replace('k', '').replace('·', '-').replace(' ', '')
-
-        # 匹配 "数字-数字" 格式
-        match = re.search(r'(\d+)-(\d+)', salary_str)
-        if match:
-            min_salary = int(match.group(1))
-            max_salary = int(match.group(2))
-            return min_salary, max_salary
-
-        # 单个数字
-        match = re.search(r'(\d+)', salary_str)
-        if match:
-            salary = int(match.group(1))
-            return salary, salary
-
-        return None, None
+        # 一次扫描提取所有数字：前两个为薪资范围，只有一个时上下限相同
+        numbers = _RE_SALARY_NUMBER.findall(salary_str)
+        if not numbers:
+            return None, None
+        if len(numbers) >= 2:
+            return int(numbers[0]), int(numbers[1])
+        return int(numbers[0]), int(numbers[0])
 
-    def _check_salary_range(self, job: Dict[str, Any]) -> bool:
+    def _check_salary_range(self, job: Job) -> bool:
         """
         检查薪资是否在可接受范围内
 
         规则：起薪 >= 20K 且 最高薪资 >= 35K
         """
-        salary_str = job.get('salary', '')
+        salary_str = job.salary
         min_salary, max_salary = self._parse_salary(salary_str)
 
         if min_salary is None or max_salary is None:
             # 无法解析薪资，默认通过
             return True
 
-        # 获取配置的薪资要求
-        min_start = self.filter_config.get('min_salary_start', 20)  # 起薪最低要求
-        min_max = self.filter_config.get('min_salary_max', 35)      # 最高薪资最低要求
+        min_start = self._min_start
+        min_max = self._min_max
 
         if min_salary < min_start:
-            logger.debug(f"薪资过低（起薪 {min_salary}K < {min_start}K）: {job.get('job_name', '')}")
+            logger.debug(f"薪资过低（起薪 {min_salary}K < {min_start}K）: {job.job_name}")
             return False
 
         if max_salary < min_max:
-            logger.debug(f"薪资过低（最高 {max_salary}K < {min_max}K）: {job.get('job_name', '')}")
+            logger.debug(f"薪资过低（最高 {max_salary}K < {min_max}K）: {job.job_name}")
             return False
 
         return True
 
-    def filter_jobs(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def filter_jobs(self, jobs: List[Job]) -> List[Job]:
         """
         过滤职位列表
 
@@ -86,7 +181,11 @@ class JobFilter:
             过滤后的职位列表
         """
         original_count = len(jobs)
+        # 多关键词搜索常返回重复职位，先去重再走过滤流程
+        jobs = dedupe_jobs(jobs)
         filtered_jobs = []
+        self._refresh_snapshot()
+        self._classify_companies({job.company for job in jobs})
 
         for job in jobs:
             if self._should_apply(job):
@@ -95,7 +194,7 @@ class JobFilter:
         logger.info(f"过滤完成：{original_count} -> {len(filtered_jobs)} 个职位")
         return filtered_jobs
 
-    def _should_apply(self, job: Dict[str, Any]) -> bool:
+    def _should_apply(self, job: Job) -> bool:
         """
         判断是否应该投递该职位
 
@@ -105,56 +204,49 @@ class JobFilter:
         Returns:
             是否应该投递
         """
-        job_id = job.get('job_id', '')
-        company = job.get('company', '')
-        job_name = job.get('job_name', '')
-        description = job.get('description', '')
+        job_id = job.job_id
+        company = job.company
+        job_name = job.job_name
+        description = job.description
 
-        # 1. 检查是否已投递
-        if self.storage.is_job_applied(job_id):
+        # 1. 检查是否已投递（未传入集合时，存储内部先查布隆过滤器，新职位无需加载投递记录）
+        if self._is_applied(job_id):
             logger.debug(f"跳过已投递职位: {job_name} - {company}")
             return False
 
-        # 2. 检查公司是否在黑名单
-        if self.storage.is_company_blacklisted(company):
+        # 2. 检查公司是否屏蔽（存储/配置黑名单、公司名黑名单关键词）
+        if company not in self._company_blocked:
+            self._classify_companies({company})
+        if self._company_blocked[company]:
             logger.debug(f"跳过黑名单公司: {company}")
             return False
 
-        # 3. 检查公司名是否包含黑名单关键词
-        company_keywords = self.filter_config.get('company_keyword_blacklist', [])
-        for keyword in company_keywords:
-            if keyword in company:
-                logger.debug(f"跳过公司名包含 '{keyword}': {company}")
-                return False
-
-        # 4. 检查配置中的公司黑名单
-        company_blacklist = self.filter_config.get('company_blacklist', [])
-        if company in company_blacklist:
-            logger.debug(f"跳过配置黑名单公司: {company}")
-            return False
-
-        # 5. 检查薪资范围
+        # 3. 检查薪资范围
         if not self._check_salary_range(job):
             return False
 
-        # 6. JD 必须包含的关键词
-        must_include = self.filter_config.get('must_include', [])
+        # 未配置 JD 关键词时无需构造待检查文本
+        if not (self._include_matcher or self._exclude_matcher):
+            return True
         text_to_check = f"{job_name} {description}".lower()
-        for keyword in must_include:
-            if keyword.lower() not in text_to_check:
-                logger.debug(f"跳过不包含关键词 '{keyword}': {job_name}")
+
+        # 4. JD 必须包含的关键词
+        if self._include_matcher:
+            missing = self._include_matcher.keywords - self._include_matcher.find_all(text_to_check)
+            if missing:
+                logger.debug(f"跳过不包含关键词 '{min(missing)}': {job_name}")
                 return False
 
-        # 6. JD 必须排除的关键词
-        must_exclude = self.filter_config.get('must_exclude', [])
-        for keyword in must_exclude:
-            if keyword.lower() in text_to_check:
-                logger.debug(f"跳过包含排除词 '{keyword}': {job_name}")
+        # 5. JD 必须排除的关键词
+        if self._exclude_matcher:
+            hit = self._exclude_matcher.find_first(text_to_check)
+            if hit:
+                logger.debug(f"跳过包含排除词 '{hit}': {job_name}")
                 return False
 
         return True
 
-    def sort_by_priority(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def sort_by_priority(self, jobs: List[Job]) -> List[Job]:
         """
         按优先级排序职位
 
@@ -168,12 +260,14 @@ class JobFilter:
         Returns:
             排序后的职位列表
         """
-        def priority_score(job: Dict[str, Any]) -> int:
+        # HR 记录只读取一次，避免排序时每个职位都重新加载
+        hr_records = set(self.storage.get_hr_records())
+
+        def priority_score(job: Job) -> int:
             score = 0
-            hr_name = job.get('hr_name', '')
+            hr_name = job.hr_name
 
             # HR 未联系过加分
-            hr_records = self.storage.get_hr_records()
             if hr_name not in hr_records:
                 score += 10
 
@@ -184,4 +278,7 @@ class JobFilter:
 
             return score
 
-        return sorted(jobs, key=priority_score, reverse=True)
+        # 先算好分数再排序，同分职位保持原有顺序（搜索结果靠前的优先）
+        scored = [(-priority_score(job), index, job) for index, job in enumerate(jobs)]
+        scored.sort()
+        return [job for _, _, job in scored]
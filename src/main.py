@@ -13,28 +13,29 @@
 """
 
 import argparse
+import importlib
 import sys
 import random
 import time
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # 添加项目根目录到路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.browser import BrowserManager
+from src.browser import BrowserManager, get_state_file
 from src.filter import JobFilter
 from src.scheduler import JobScheduler
-from src.platforms import BossPlatform, LiepinPlatform
 from src.utils.config import Config
 from src.utils.storage import Storage
 from src.utils.logger import logger
 
 
-# 平台映射
-PLATFORM_CLASSES = {
-    'boss': BossPlatform,
-    'liepin': LiepinPlatform,
+# 平台类加载器：只在运行该平台时导入对应模块
+PLATFORM_LOADERS = {
+    'boss': lambda: importlib.import_module('src.platforms.boss').BossPlatform,
+    'liepin': lambda: importlib.import_module('src.platforms.liepin').LiepinPlatform,
 }
 
 
@@ -43,7 +44,8 @@ def run_platform_task(
     config: Config,
     headless: bool = False,
     weekend_mode: bool = False,
-    weekend_limit: int = 10
+    weekend_limit: int = 10,
+    browser_manager: Optional[BrowserManager] = None
 ) -> Dict[str, int]:
     """
     执行单个平台的投递任务
@@ -54,6 +56,7 @@ def run_platform_task(
         headless: 是否无头模式
         weekend_mode: 是否周末模式
         weekend_limit: 周末投递上限
+        browser_manager: 复用的浏览器管理器，None 表示本次新建并在结束时关闭
 
     Returns:
         投递统计
@@ -61,40 +64,60 @@ def run_platform_task(
     stats = {'success': 0, 'failed': 0, 'skipped': 0}
 
     platform_config = config.get_platform_config(platform_name)
-    cookie = config.get_cookie(platform_name)
     storage = Storage(platform=platform_name)
 
-    platform_display = "Boss直聘" if platform_name == "boss" else "猎聘网"
-
-    # 检查 Cookie
-    if not cookie:
-        cookie_file = "cookie.txt" if platform_name == "boss" else f"cookie_{platform_name}.txt"
-        logger.error(f"[{platform_display}] 请先在 {cookie_file} 中配置 Cookie")
-        return stats
-
     # 获取平台类
-    PlatformClass = PLATFORM_CLASSES.get(platform_name)
+    loader = PLATFORM_LOADERS.get(platform_name)
+    PlatformClass = loader() if loader else None
     if not PlatformClass:
         logger.error(f"不支持的平台: {platform_name}")
         return stats
 
-    logger.info(f"[{platform_display}] 开始投递任务")
+    # 日志前缀在整个任务中不变，只拼接一次
+    prefix = f"[{PlatformClass.display_name}]"
 
-    # 创建浏览器管理器（使用平台对应的 Cookie）
-    browser_manager = BrowserManager(config, platform=platform_name)
+    # 检查登录凭据：已保存会话状态时无需读取 Cookie 文件
+    if not get_state_file(config, platform_name).exists() and not config.get_cookie(platform_name):
+        cookie_file = config.get_cookie_path(platform_name).name
+        logger.error(f"{prefix} 请先在 {cookie_file} 中配置 Cookie")
+        return stats
+
+    logger.info(f"{prefix} 开始投递任务")
+
+    # 创建浏览器管理器（使用平台对应的 Cookie），传入时复用已启动的浏览器
+    owns_browser = browser_manager is None
+    if owns_browser:
+        browser_manager = BrowserManager(config, platform=platform_name, display_name=PlatformClass.display_name)
+
+    # 投递成功的记录先缓存在内存中，在投递间隔内或结束时批量写入
+    pending_records: Dict[str, Dict[str, Any]] = {}
+    # 详情页显示已沟通过的职位，记录后下次运行直接过滤，不再打开详情页（不计入今日投递数）
+    contacted_records: Dict[str, Dict[str, Any]] = {}
+
+    def flush_pending() -> None:
+        """写入缓存的投递记录（每个数据文件只写一次）"""
+        with storage.batched():
+            if pending_records:
+                storage.add_applied_jobs(pending_records)
+                storage.increment_today_apply_count(len(pending_records))
+                pending_records.clear()
+            if contacted_records:
+                storage.add_applied_jobs(contacted_records, status='contacted')
+                contacted_records.clear()
 
     try:
-        page = browser_manager.start(headless=headless)
+        browser_manager.start_browser(headless=headless)
+        page = browser_manager.new_page()
 
         # 创建平台实例
-        platform = PlatformClass(page, platform_config)
+        platform = PlatformClass(page, platform_config, browser_manager.rate_limiter)
 
         # 搜索职位
         keywords = platform_config.get('search', {}).get('keywords', [])
         jobs = platform.search_all_keywords(keywords)
 
         if not jobs:
-            logger.warning(f"[{platform_display}] 未找到任何职位")
+            logger.warning(f"{prefix} 未找到任何职位")
             return stats
 
         # 过滤职位
@@ -103,7 +126,7 @@ def run_platform_task(
         filtered_jobs = job_filter.sort_by_priority(filtered_jobs)
 
         if not filtered_jobs:
-            logger.info(f"[{platform_display}] 过滤后没有可投递的职位")
+            logger.info(f"{prefix} 过滤后没有可投递的职位")
             return stats
 
         # 投递配置
@@ -116,58 +139,77 @@ def run_platform_task(
         # 周末模式限制
         if weekend_mode:
             batch_limit = min(batch_limit, weekend_limit)
-            logger.info(f"[{platform_display}] 周末模式，本次投递上限: {batch_limit}")
+            logger.info(f"{prefix} 周末模式，本次投递上限: {batch_limit}")
 
         # 检查今日投递数量
         today_count = storage.get_today_apply_count()
         if today_count >= daily_limit:
-            logger.warning(f"[{platform_display}] 今日已达投递上限 ({daily_limit})")
+            logger.warning(f"{prefix} 今日已达投递上限 ({daily_limit})")
             return stats
 
         remaining = min(batch_limit, daily_limit - today_count)
-        logger.info(f"[{platform_display}] 今日已投递 {today_count} 个，本次最多投递 {remaining} 个")
+        logger.info(f"{prefix} 今日已投递 {today_count} 个，本次最多投递 {remaining} 个")
 
         # 投递职位
-        for i, job in enumerate(filtered_jobs[:remaining]):
-            job_name = job.get('job_name', '')
-            company = job.get('company', '')
+        jobs_to_apply = filtered_jobs[:remaining]
+        for i, job in enumerate(jobs_to_apply):
+            job_name = job.job_name
+            company = job.company
 
-            logger.info(f"[{platform_display}] [{i + 1}/{remaining}] 投递: {job_name} - {company}")
+            logger.info(f"{prefix} [{i + 1}/{remaining}] 投递: {job_name} - {company}")
 
             try:
                 success = platform.apply_job(job)
                 if success:
                     stats['success'] += 1
-                    storage.add_applied_job(job['job_id'], {
+                    pending_records[job.job_id] = {
+                        'job_name': job_name,
+                        'company': company,
+                        'hr_name': job.hr_name,
+                        'salary': job.salary,
+                        'url': job.url,
+                        'platform': platform_name,
+                        'apply_time': datetime.now().isoformat()
+                    }
+                    logger.info(f"{prefix} ✓ 投递成功: {job_name}")
+                elif job.job_id in platform.contacted_ids:
+                    stats['skipped'] += 1
+                    contacted_records[job.job_id] = {
                         'job_name': job_name,
                         'company': company,
-                        'hr_name': job.get('hr_name', ''),
-                        'salary': job.get('salary', ''),
-                        'url': job.get('url', ''),
+                        'url': job.url,
                         'platform': platform_name
-                    })
-                    storage.increment_today_apply_count()
-                    logger.info(f"[{platform_display}] ✓ 投递成功: {job_name}")
+                    }
+                    logger.info(f"{prefix} - 已沟通过，跳过: {job_name}")
                 else:
                     stats['failed'] += 1
-                    logger.warning(f"[{platform_display}] ✗ 投递失败: {job_name}")
+                    logger.warning(f"{prefix} ✗ 投递失败: {job_name}")
             except Exception as e:
                 stats['failed'] += 1
-                logger.error(f"[{platform_display}] ✗ 投递异常: {job_name} - {e}")
+                logger.error(f"{prefix} ✗ 投递异常: {job_name} - {e}")
 
-            # 随机延迟
-            if i < remaining - 1:
+            # 随机延迟：等待期间写入投递记录、预加载下一个职位详情页，只睡剩余的时间
+            if i < len(jobs_to_apply) - 1:
                 delay = random.uniform(interval_min, interval_max)
+                deadline = time.monotonic() + delay
+                flush_pending()
+                platform.prefetch_job(jobs_to_apply[i + 1])
                 logger.debug(f"等待 {delay:.1f} 秒...")
-                time.sleep(delay)
+                time.sleep(max(0.0, deadline - time.monotonic()))
 
-        logger.info(f"[{platform_display}] 投递完成: 成功 {stats['success']}, 失败 {stats['failed']}")
+        logger.info(f"{prefix} 投递完成: 成功 {stats['success']}, 失败 {stats['failed']}, 跳过 {stats['skipped']}")
 
     except Exception as e:
-        logger.error(f"[{platform_display}] 执行出错: {e}")
+        logger.error(f"{prefix} 执行出错: {e}")
         raise
     finally:
-        browser_manager.close()
+        # 出错时也保存已成功的投递，避免重复投递
+        flush_pending()
+
+        if owns_browser:
+            browser_manager.close()
+        else:
+            browser_manager.reset_pages()
 
     return stats
 
@@ -176,7 +218,8 @@ def run_apply_task(
     platforms: List[str] = None,
     headless: bool = False,
     weekend_mode: bool = False,
-    weekend_limit: int = 10
+    weekend_limit: int = 10,
+    browser_managers: Optional[Dict[str, BrowserManager]] = None
 ) -> None:
     """
     执行投递任务（支持多平台）
@@ -186,6 +229,8 @@ def run_apply_task(
         headless: 是否无头模式
         weekend_mode: 是否周末模式
         weekend_limit: 周末投递上限
+        browser_managers: 按平台复用的浏览器管理器（定时任务模式下跨次复用），
+            None 表示本次新建并在结束时关闭
     """
     config = Config()
 
@@ -193,33 +238,53 @@ def run_apply_task(
     if platforms is None:
         platforms = config.enabled_platforms
 
-    total_stats = {'success': 0, 'failed': 0, 'skipped': 0}
+    owns_browsers = browser_managers is None
+    if owns_browsers:
+        browser_managers = {}
 
-    for platform_name in platforms:
-        if platform_name not in PLATFORM_CLASSES:
-            logger.warning(f"跳过不支持的平台: {platform_name}")
-            continue
+    total_stats = {'success': 0, 'failed': 0, 'skipped': 0}
 
-        try:
-            stats = run_platform_task(
+    try:
+        # 各平台使用独立的浏览器和线程，同时提交后并发执行，总耗时取决于最慢的平台
+        futures = {}
+        for platform_name in platforms:
+            if platform_name not in PLATFORM_LOADERS:
+                logger.warning(f"跳过不支持的平台: {platform_name}")
+                continue
+
+            browser_manager = browser_managers.get(platform_name)
+            if browser_manager is None:
+                browser_manager = BrowserManager(
+                    config, platform=platform_name, display_name=PLATFORM_LOADERS[platform_name]().display_name
+                )
+                browser_managers[platform_name] = browser_manager
+            browser_manager.config = config
+
+            # 浏览器操作必须在浏览器管理器的专用线程中执行
+            futures[platform_name] = browser_manager.executor.submit(
+                run_platform_task,
                 platform_name,
                 config,
                 headless=headless,
                 weekend_mode=weekend_mode,
-                weekend_limit=weekend_limit
+                weekend_limit=weekend_limit,
+                browser_manager=browser_manager
             )
 
-            total_stats['success'] += stats['success']
-            total_stats['failed'] += stats['failed']
-            total_stats['skipped'] += stats['skipped']
+        for platform_name, future in futures.items():
+            try:
+                stats = future.result()
 
-            # 平台之间等待
-            if platform_name != platforms[-1]:
-                logger.info("等待 30 秒后开始下一个平台...")
-                time.sleep(30)
+                total_stats['success'] += stats['success']
+                total_stats['failed'] += stats['failed']
+                total_stats['skipped'] += stats['skipped']
 
-        except Exception as e:
-            logger.error(f"平台 {platform_name} 执行失败: {e}")
+            except Exception as e:
+                logger.error(f"平台 {platform_name} 执行失败: {e}")
+    finally:
+        if owns_browsers:
+            for browser_manager in browser_managers.values():
+                browser_manager.shutdown()
 
     # 输出总统计
     logger.info("=" * 50)
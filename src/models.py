@@ -0,0 +1,19 @@
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass(slots=True)
+class Job:
+    """职位信息（各平台解析结果的统一结构）"""
+
+    job_id: str
+    job_name: str = ''
+    salary: str = ''
+    company: str = ''
+    location: str = ''
+    tags: List[str] = field(default_factory=list)
+    hr_name: str = ''
+    hr_title: str = ''
+    url: str = ''
+    platform: str = ''
+    description: str = ''
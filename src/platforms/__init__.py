@@ -1,5 +1,17 @@
-from .base import BasePlatform
-from .boss import BossPlatform
-from .liepin import LiepinPlatform
+import importlib
+
+# 平台类按需导入（PEP 562），只运行一个平台时不加载其他平台模块
+_PLATFORM_MODULES = {
+    'BasePlatform': '.base',
+    'BossPlatform': '.boss',
+    'LiepinPlatform': '.liepin',
+}
 
 __all__ = ['BasePlatform', 'BossPlatform', 'LiepinPlatform']
+
+
+def __getattr__(name: str):
+    module = _PLATFORM_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
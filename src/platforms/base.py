@@ -1,48 +1,216 @@
-from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+import random
+import time
+from collections import deque
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Set, Callable
 from playwright.sync_api import Page, BrowserContext
+from ..apply import render_greeting
+from ..filter import dedupe_jobs
+from ..models import Job
 from ..utils.logger import logger
-
-
-class BasePlatform(ABC):
-    """招聘平台抽象基类"""
+from ..utils.rate_limit import TokenBucket
+
+
+# 默认同时打开的搜索标签页数，以及不论配置如何的上限（避免单 IP 请求过多）
+DEFAULT_SEARCH_CONCURRENCY = 3
+MAX_SEARCH_CONCURRENCY = 8
+# 同一批标签页之间错开发起请求的随机间隔（秒），避免同时访问同一站点
+SEARCH_STAGGER = (0.5, 1.5)
+# 调试截图和页面 HTML 的保存目录
+DEBUG_DIR = Path(__file__).parent.parent.parent / "logs"
+
+
+def search_in_tab_pool(
+    name: str,
+    main_page: Page,
+    keywords: List[str],
+    concurrency: int,
+    start_search: Callable[[str, Page], None],
+    collect_results: Callable[[str, Page], List[Job]],
+    is_login_expired: Callable[[], bool],
+    rng: random.Random
+) -> List[Job]:
+    """
+    用标签页工作池搜索所有关键词
+
+    在 main_page 所在上下文中打开若干标签页：每个标签页解析完当前关键词后
+    立即开始加载下一个关键词，页面加载时间与解析互相重叠。
+
+    Args:
+        name: 平台名称（用于日志）
+        main_page: 主页面，作为第一个标签页，结束时保留
+        keywords: 搜索关键词列表
+        concurrency: 配置的标签页数，不超过 MAX_SEARCH_CONCURRENCY 和关键词数
+        start_search: 在指定标签页开始加载关键词的搜索结果
+        collect_results: 等待指定标签页的搜索结果加载完成并解析
+        is_login_expired: 是否已检测到登录失效
+        rng: 错开请求用的随机数生成器
+
+    Returns:
+        所有职位列表（已去重）
+    """
+    all_jobs = []
+    concurrency = max(1, min(concurrency, MAX_SEARCH_CONCURRENCY, len(keywords)))
+    pages = [main_page] + [main_page.context.new_page() for _ in range(concurrency - 1)]
+    remaining = iter(keywords)
+    # 已开始加载、等待解析的 (标签页, 关键词)，按开始顺序解析
+    in_flight = deque()
+
+    try:
+        for i, (page, keyword) in enumerate(zip(pages, remaining)):
+            if i:
+                time.sleep(rng.uniform(*SEARCH_STAGGER))
+            start_search(keyword, page)
+            in_flight.append((page, keyword))
+
+        while in_flight:
+            page, keyword = in_flight.popleft()
+            all_jobs.extend(collect_results(keyword, page))
+
+            # 登录失效时其余关键词同样拿不到结果，不再发起新的搜索
+            if is_login_expired():
+                logger.warning(f"[{name}] 登录状态已失效，跳过剩余关键词")
+                break
+
+            # 空出的标签页继续加载下一个关键词
+            next_keyword = next(remaining, None)
+            if next_keyword is not None:
+                start_search(next_keyword, page)
+                in_flight.append((page, next_keyword))
+    finally:
+        for page in pages[1:]:
+            page.close()
+
+    # 所有关键词的结果合并后一次去重
+    all_jobs = dedupe_jobs(all_jobs)
+    logger.info(f"[{name}] 所有关键词搜索完成，共找到 {len(all_jobs)} 个不重复职位")
+    return all_jobs
+
+
+class BasePlatform:
+    """招聘平台基类（子类需实现未实现的方法）"""
 
     name: str = "base"  # 平台名称
+    display_name: str = "base"  # 平台显示名称（用于日志）
     base_url: str = ""  # 平台基础 URL
 
-    def __init__(self, page: Page, config: Dict[str, Any]):
+    def __init__(self, page: Page, config: Dict[str, Any], rate_limiter: Optional[TokenBucket] = None):
         self.page = page
         self.config = config
+        # 页面跳转前取令牌，限制对平台的访问频率
+        self.rate_limiter = rate_limiter
+        self.greetings = tuple(config.get('greetings', []))
+        # 调试模式下才保存截图和页面 HTML，正常投递只做跳转和点击
+        self.debug = bool(config.get('debug', False))
+        # 每个平台独立的随机数生成器，并发运行时不共享全局随机状态
+        self._rng = random.Random()
+        # 预加载下一个职位详情页的备用标签页，投递时与 self.page 交换
+        self._prefetch_page: Optional[Page] = None
+        self._prefetched_url = ''
+        # 详情页显示已沟通过的职位 ID，由调用方记录，下次运行在打开详情页之前即被过滤
+        self.contacted_ids: Set[str] = set()
+        # 检测到登录失效后置为 True，本次运行不再继续搜索
+        self.login_expired = False
 
-    @abstractmethod
     def build_search_url(self, keyword: str) -> str:
         """构建搜索 URL"""
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
-    def search_jobs(self, keyword: str) -> List[Dict[str, Any]]:
+    def search_jobs(self, keyword: str) -> List[Job]:
         """搜索职位"""
-        pass
-
-    @abstractmethod
-    def parse_job_list(self) -> List[Dict[str, Any]]:
+        self.start_search(keyword, self.page)
+        return self.collect_search_results(keyword)
+
+    def start_search(self, keyword: str, page: Page) -> None:
+        """在指定页面打开搜索结果页（只等待导航提交，不等待页面加载完成）"""
+        url = self.build_search_url(keyword)
+        logger.info(f"[{self.name}] 搜索关键词: {keyword}")
+        logger.info(f"[{self.name}] 访问 URL: {url}")
+
+        self.throttle()
+        try:
+            page.goto(url, wait_until='commit', timeout=30000)
+        except Exception as e:
+            logger.warning(f"[{self.name}] 页面加载异常: {e}")
+
+    def collect_search_results(self, keyword: str) -> List[Job]:
+        """等待当前页面的搜索结果加载完成并解析"""
+        raise NotImplementedError
+
+    def parse_job_list(self) -> List[Job]:
         """解析职位列表"""
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
-    def parse_job_card(self, card) -> Optional[Dict[str, Any]]:
+    def parse_job_card(self, card) -> Optional[Job]:
         """解析单个职位卡片"""
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
-    def apply_job(self, job: Dict[str, Any]) -> bool:
+    def apply_job(self, job: Job) -> bool:
         """投递职位"""
-        pass
+        raise NotImplementedError
 
-    @abstractmethod
-    def send_greeting(self, greeting: str) -> bool:
+    def send_greeting(self, job: Optional[Job] = None) -> bool:
         """发送打招呼消息"""
-        pass
+        raise NotImplementedError
+
+    def prefetch_job(self, job: Job) -> None:
+        """在备用标签页中提前打开职位详情页（只等待导航提交），投递间隔内加载"""
+        if not job.url:
+            return
+
+        if self._prefetch_page is None or self._prefetch_page.is_closed():
+            self._prefetch_page = self.page.context.new_page()
+
+        self.throttle()
+        try:
+            self._prefetch_page.goto(job.url, wait_until='commit')
+            self._prefetched_url = job.url
+        except Exception as e:
+            logger.debug(f"[{self.name}] 预加载职位详情页失败: {e}")
+            self._prefetched_url = ''
+
+    def open_job_page(self, url: str, **goto_kwargs) -> None:
+        """打开职位详情页，已预加载时直接切换到预加载的标签页"""
+        if self._prefetched_url == url and self._prefetch_page is not None:
+            self.page, self._prefetch_page = self._prefetch_page, self.page
+            self._prefetched_url = ''
+            return
+
+        self.throttle()
+        self.page.goto(url, **goto_kwargs)
+
+    def throttle(self) -> None:
+        """页面跳转前按限流器等待"""
+        if self.rate_limiter is not None:
+            waited = self.rate_limiter.acquire()
+            if waited > 0:
+                logger.debug(f"[{self.name}] 访问限流，等待 {waited:.1f} 秒")
+
+    def save_debug_snapshot(self, name: str, html: bool = False) -> None:
+        """
+        调试模式下保存当前页面截图（可选同时保存 HTML），用于排查失败原因
+
+        Args:
+            name: 文件名（不含扩展名）
+            html: 是否同时保存页面 HTML
+        """
+        if not self.debug:
+            return
+        try:
+            screenshot_path = DEBUG_DIR / f"{name}.png"
+            self.page.screenshot(path=str(screenshot_path))
+            logger.info(f"[{self.name}] 已保存调试截图: {screenshot_path}")
+            if html:
+                html_path = DEBUG_DIR / f"{name}.html"
+                html_path.write_text(self.page.content(), encoding='utf-8')
+                logger.info(f"[{self.name}] 已保存页面HTML: {html_path}")
+        except Exception as e:
+            logger.debug(f"[{self.name}] 保存调试截图失败: {e}")
+
+    def pick_greeting(self, job: Optional[Job] = None) -> str:
+        """随机选择打招呼模板，并填入职位变量"""
+        template = self._rng.choice(self.greetings)
+        return render_greeting(template, job) if job else template
 
     def check_login_required(self) -> bool:
         """检查是否需要登录（子类可覆盖）"""
@@ -50,24 +218,31 @@ class BasePlatform(ABC):
             return True
         return False
 
-    def search_all_keywords(self, keywords: List[str]) -> List[Dict[str, Any]]:
-        """搜索所有关键词（通用实现）"""
-        import time
-        all_jobs = []
-        seen_ids = set()
-
-        for keyword in keywords:
-            jobs = self.search_jobs(keyword)
-
-            for job in jobs:
-                if job['job_id'] not in seen_ids:
-                    seen_ids.add(job['job_id'])
-                    all_jobs.append(job)
-
-            time.sleep(2)
-
-        logger.info(f"[{self.name}] 所有关键词搜索完成，共找到 {len(all_jobs)} 个不重复职位")
-        return all_jobs
+    def search_all_keywords(self, keywords: List[str]) -> List[Job]:
+        """
+        搜索所有关键词（通用实现，标签页工作池见 search_in_tab_pool）
+
+        Args:
+            keywords: 搜索关键词列表
+
+        Returns:
+            所有职位列表（已去重）
+        """
+        main_page = self.page
+
+        def collect(keyword: str, page: Page) -> List[Job]:
+            # 解析方法都作用于 self.page，切换到对应标签页
+            self.page = page
+            return self.collect_search_results(keyword)
+
+        try:
+            return search_in_tab_pool(
+                self.name, main_page, keywords,
+                self.config.get('search', {}).get('max_concurrency', DEFAULT_SEARCH_CONCURRENCY),
+                self.start_search, collect, lambda: self.login_expired, self._rng
+            )
+        finally:
+            self.page = main_page
 
     def get_platform_storage_prefix(self) -> str:
         """获取平台存储前缀"""
@@ -1,15 +1,54 @@
-import time
-import random
+import re
 from typing import List, Dict, Any, Optional
-from playwright.sync_api import Page
+from urllib.parse import quote, urlencode
+from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
 from .base import BasePlatform
+from ..apply import CHAT_INPUT_SELECTOR, SEND_BUTTON_SELECTOR
+from ..models import Job
+from ..utils.rate_limit import TokenBucket
 from ..utils.logger import logger
 
 
+# 在页面内一次性提取所有职位卡片，避免逐个元素调用 query_selector/inner_text 往返；
+# 同时按 spec 跳过黑名单公司和职位名含排除词的卡片，被过滤的卡片不再传回
+JOB_CARDS_SCRIPT = """(spec) => Array.from(document.querySelectorAll('.job-card-wrap'), card => {
+    const link = card.querySelector('.job-name');
+    if (!link) return null;
+    const text = (selector) => card.querySelector(selector)?.innerText.trim() || '';
+    const jobName = link.innerText.trim();
+    const company = text('.boss-name');
+    const companyLower = company.toLowerCase();
+    const jobNameLower = jobName.toLowerCase();
+    if (spec.companies.includes(company)
+        || spec.companyKeywords.some(k => companyLower.includes(k))
+        || spec.excludeKeywords.some(k => jobNameLower.includes(k))) {
+        return null;
+    }
+    return {
+        href: link.getAttribute('href') || '',
+        job_name: jobName,
+        salary: text('.job-salary'),
+        company: company,
+        location: text('.company-location'),
+        tags: Array.from(card.querySelectorAll('.tag-list li'), t => t.innerText.trim())
+    };
+})"""
+
+# 从职位链接中提取 job_id，格式如：/job_detail/xxx.html?lid=...，取路径最后一段去掉 .html
+_RE_JOB_ID = re.compile(r'[^?#]*/([^/?#.]+)')
+
+
+def extract_job_id(href: str) -> str:
+    """从职位链接中提取 job_id，无法识别时返回空字符串"""
+    match = _RE_JOB_ID.match(href)
+    return match.group(1) if match else ''
+
+
 class BossPlatform(BasePlatform):
     """Boss直聘平台实现"""
 
     name = "boss"
+    display_name = "Boss直聘"
     base_url = "https://www.zhipin.com"
 
     # URL 参数映射（与 url_params.yaml 保持一致）
@@ -42,11 +81,22 @@ class BossPlatform(BasePlatform):
         }
     }
 
-    def __init__(self, page: Page, config: Dict[str, Any]):
-        super().__init__(page, config)
+    def __init__(self, page: Page, config: Dict[str, Any], rate_limiter: Optional[TokenBucket] = None):
+        super().__init__(page, config, rate_limiter)
         self.search_config = config.get('search', {})
         self.apply_config = config.get('apply', {})
-        self.greetings = config.get('greetings', [])
+        # 城市、薪资、经验、学历在一次运行中不变，URL 参数只需计算一次
+        codes = ((param_type, self.get_url_param(param_type, self.search_config.get(param_type, '')))
+                 for param_type in ('city', 'salary', 'experience', 'degree'))
+        self._url_suffix = urlencode([(name, code) for name, code in codes if code])
+
+        # 列表页可直接判定的过滤条件，传入 JOB_CARDS_SCRIPT 在页面内预过滤（与 JobFilter 规则一致）
+        filter_config = config.get('filter', {})
+        self._card_filter = {
+            'companies': list(filter_config.get('company_blacklist', [])),
+            'companyKeywords': [k.lower() for k in filter_config.get('company_keyword_blacklist', []) if k],
+            'excludeKeywords': [k.lower() for k in filter_config.get('must_exclude', []) if k],
+        }
 
     def get_url_param(self, param_type: str, value: str) -> str:
         """将中文配置值转换为 URL 参数编码"""
@@ -55,42 +105,20 @@ class BossPlatform(BasePlatform):
 
     def build_search_url(self, keyword: str) -> str:
         """构建搜索 URL"""
-        base_url = f"{self.base_url}/web/geek/jobs"
-        params = [f"query={keyword}"]
-
-        # 城市
-        city_code = self.get_url_param('city', self.search_config.get('city', ''))
-        if city_code:
-            params.append(f"city={city_code}")
-
-        # 薪资
-        salary_code = self.get_url_param('salary', self.search_config.get('salary', ''))
-        if salary_code:
-            params.append(f"salary={salary_code}")
-
-        # 经验
-        exp_code = self.get_url_param('experience', self.search_config.get('experience', ''))
-        if exp_code:
-            params.append(f"experience={exp_code}")
-
-        # 学历
-        degree_code = self.get_url_param('degree', self.search_config.get('degree', ''))
-        if degree_code:
-            params.append(f"degree={degree_code}")
+        url = f"{self.base_url}/web/geek/jobs?query={quote(keyword)}"
+        return f"{url}&{self._url_suffix}" if self._url_suffix else url
 
-        return f"{base_url}?{'&'.join(params)}"
-
-    def search_jobs(self, keyword: str) -> List[Dict[str, Any]]:
-        """搜索职位"""
-        url = self.build_search_url(keyword)
-        logger.info(f"搜索关键词: {keyword}")
-        logger.info(f"访问 URL: {url}")
-
-        self.page.goto(url)
-        time.sleep(2)
+    def collect_search_results(self, keyword: str) -> List[Job]:
+        """等待搜索结果页加载并解析"""
+        # 等待职位列表或登录按钮出现，替代固定等待
+        try:
+            self.page.wait_for_selector('.job-card-wrap, .btn-sign', state='attached', timeout=10000)
+        except PlaywrightTimeoutError:
+            pass
 
         if self.check_login_required():
             logger.error("登录状态已失效，请更新 cookie.txt")
+            self.login_expired = True
             return []
 
         jobs = self.parse_job_list()
@@ -102,139 +130,109 @@ class BossPlatform(BasePlatform):
         """检查是否需要登录"""
         if 'login' in self.page.url:
             return True
-        login_btn = self.page.query_selector('.btn-sign')
-        return login_btn is not None
+        return self.page.locator('.btn-sign').count() > 0
 
-    def parse_job_list(self) -> List[Dict[str, Any]]:
-        """解析职位列表"""
+    def parse_job_list(self) -> List[Job]:
+        """解析职位列表（页面已由 collect_search_results 等待加载）"""
         jobs = []
 
-        try:
-            self.page.wait_for_selector('.job-card-wrap', timeout=10000)
-        except Exception:
+        if not self.page.locator('.job-card-wrap').count():
             logger.warning("未找到职位列表，可能没有匹配的职位或页面结构已变化")
             return []
 
-        job_cards = self.page.query_selector_all('.job-card-wrap')
+        job_cards = self.page.evaluate(JOB_CARDS_SCRIPT, self._card_filter)
 
+        # 循环内使用的方法先绑定到局部变量
+        parse_job_card = self.parse_job_card
+        append = jobs.append
         for card in job_cards:
-            try:
-                job = self.parse_job_card(card)
-                if job:
-                    jobs.append(job)
-            except Exception as e:
-                logger.debug(f"解析职位卡片失败: {e}")
+            if not card:
                 continue
+            job = parse_job_card(card)
+            if job:
+                append(job)
 
         return jobs
 
-    def parse_job_card(self, card) -> Optional[Dict[str, Any]]:
-        """解析单个职位卡片"""
+    def parse_job_card(self, card: Dict[str, Any]) -> Optional[Job]:
+        """解析单个职位卡片（card 为 JOB_CARDS_SCRIPT 提取出的字段）"""
         try:
-            job_link = card.query_selector('.job-name')
-            if not job_link:
-                return None
-
-            href = job_link.get_attribute('href') or ''
-            job_id = href.split('/')[-1].replace('.html', '') if href else ''
-
-            job_name = job_link.inner_text().strip() if job_link else ''
-
-            salary_el = card.query_selector('.job-salary')
-            salary = salary_el.inner_text().strip() if salary_el else ''
-
-            company_el = card.query_selector('.boss-name')
-            company = company_el.inner_text().strip() if company_el else ''
-
-            location_el = card.query_selector('.company-location')
-            location = location_el.inner_text().strip() if location_el else ''
-
-            tags = []
-            tag_elements = card.query_selector_all('.tag-list li')
-            tags = [t.inner_text().strip() for t in tag_elements]
-
-            return {
-                'job_id': job_id,
-                'job_name': job_name,
-                'salary': salary,
-                'company': company,
-                'location': location,
-                'tags': tags,
-                'hr_name': '',
-                'hr_title': '',
-                'url': f"{self.base_url}{href}" if href else '',
-                'platform': self.name
-            }
+            get = card.get
+            href = get('href', '')
+            job_id = extract_job_id(href)
+
+            return Job(
+                job_id=job_id,
+                job_name=get('job_name', ''),
+                salary=get('salary', ''),
+                company=get('company', ''),
+                location=get('location', ''),
+                tags=get('tags', []),
+                url=f"{self.base_url}{href}" if href else '',
+                platform=self.name
+            )
         except Exception as e:
             logger.debug(f"解析职位卡片异常: {e}")
             return None
 
-    def apply_job(self, job: Dict[str, Any]) -> bool:
+    def apply_job(self, job: Job) -> bool:
         """投递职位"""
-        url = job.get('url', '')
+        url = job.url
         if not url:
             return False
 
-        self.page.goto(url)
-        time.sleep(2)
+        self.open_job_page(url)
+        # 等待沟通按钮、登录按钮或错误页出现，替代固定等待
+        try:
+            self.page.wait_for_selector('.btn-startchat, .btn-sign, .error-content', timeout=8000)
+        except PlaywrightTimeoutError:
+            pass
 
         # 查找"立即沟通"按钮
-        chat_btn = self.page.query_selector('.btn-startchat')
-        if not chat_btn:
+        chat_btn = self.page.locator('.btn-startchat').first
+        if not chat_btn.count():
             logger.debug("未找到'立即沟通'按钮")
             return False
 
         btn_text = chat_btn.inner_text().strip()
         if '继续沟通' in btn_text:
             logger.debug("已经沟通过，跳过")
+            self.contacted_ids.add(job.job_id)
             return False
 
         chat_btn.click()
-        time.sleep(2)
 
         return self.send_greeting(job)
 
-    def send_greeting(self, job: Dict[str, Any] = None) -> bool:
+    def send_greeting(self, job: Optional[Job] = None) -> bool:
         """发送打招呼消息"""
         if not self.greetings:
             logger.warning("未配置打招呼模板")
             return True
 
-        greeting = random.choice(self.greetings)
+        greeting = self.pick_greeting(job)
 
-        if job:
-            greeting = greeting.replace('{position}', job.get('job_name', ''))
-            greeting = greeting.replace('{company}', job.get('company', ''))
-
-        input_selectors = [
-            '.chat-input textarea',
-            '.message-input textarea',
-            '#chat-input',
-            'textarea.input-area'
-        ]
-
-        input_box = None
-        for selector in input_selectors:
-            input_box = self.page.query_selector(selector)
-            if input_box:
-                break
+        # 等待聊天输入框出现（多个候选合并为一个选择器），直接使用返回的元素
+        try:
+            input_box = self.page.wait_for_selector(CHAT_INPUT_SELECTOR, timeout=5000)
+        except PlaywrightTimeoutError:
+            input_box = None
 
         if input_box:
             input_box.fill(greeting)
-            time.sleep(0.5)
-
-            send_selectors = [
-                '.btn-send',
-                '.send-btn',
-                'button:has-text("发送")'
-            ]
-
-            for selector in send_selectors:
-                send_btn = self.page.query_selector(selector)
-                if send_btn:
-                    send_btn.click()
-                    time.sleep(1)
-                    logger.debug(f"已发送打招呼: {greeting[:30]}...")
-                    return True
+
+            try:
+                send_btn = self.page.wait_for_selector(SEND_BUTTON_SELECTOR, state='visible', timeout=3000)
+            except PlaywrightTimeoutError:
+                send_btn = None
+
+            if send_btn:
+                send_btn.click()
+                # 输入框被清空说明消息已发出
+                try:
+                    self.page.wait_for_function('el => !el.value', arg=input_box, timeout=3000)
+                except PlaywrightTimeoutError:
+                    pass
+                logger.debug(f"已发送打招呼: {greeting[:30]}...")
 
         return True
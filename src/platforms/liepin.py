@@ -1,15 +1,114 @@
-import time
-import random
+import re
+import urllib.parse
 from typing import List, Dict, Any, Optional
-from playwright.sync_api import Page
+from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
 from .base import BasePlatform
+from ..models import Job
+from ..utils.rate_limit import TokenBucket
 from ..utils.logger import logger
 
 
+# 猎聘的职位卡片选择器（2024年新版页面结构），按优先级排列
+JOB_CARD_SELECTORS = (
+    '.job-card-pc-container',
+    '.job-list-box .job-card',
+    '[class*="job-card"]',
+    '.job-detail-box',
+    'div[style*="job"]',
+)
+# 合并为一个选择器，只需等待一次
+_JOB_CARD_SELECTOR = ', '.join(JOB_CARD_SELECTORS)
+
+# 配置项 -> 搜索 URL 参数名（薪资为年薪 salaryCode）
+URL_PARAM_NAMES = {
+    'city': 'dqs',
+    'salary': 'salaryCode',
+    'experience': 'workYearCode',
+    'degree': 'eduLevel',
+}
+
+# 职位详情页的"聊一聊"等投递按钮，优先找右上角的大按钮：(CSS 选择器, 需包含的文字)，按优先级排列
+APPLY_BUTTON_CANDIDATES = (
+    ('button', '聊一聊'),
+    ('a', '聊一聊'),
+    ('.job-apply-btn', ''),
+    ('.btn-chat', ''),
+    ('button', '立即沟通'),
+    ('button', '投递简历'),
+)
+# 等待用的 Playwright 选择器（任一候选出现即可）
+_APPLY_BUTTON_SELECTOR = ', '.join(
+    f'{css}:has-text("{text}")' if text else css for css, text in APPLY_BUTTON_CANDIDATES
+)
+
+# 在页面内按优先级查找第一个可见的投递按钮，避免逐个元素调用 is_visible/inner_text 往返；
+# 文字过长的是包含按钮的容器，不是真正的按钮
+APPLY_BUTTON_SCRIPT = """(candidates) => {
+    for (const [css, text] of candidates) {
+        for (const el of document.querySelectorAll(css)) {
+            const label = el.innerText.trim();
+            if (text && !label.includes(text)) continue;
+            const rect = el.getBoundingClientRect();
+            if (!rect.width || !rect.height || getComputedStyle(el).visibility === 'hidden') continue;
+            if (label.length < 20 && /聊|沟通|投递/.test(label)) return el;
+        }
+    }
+    return null;
+}"""
+
+# 聊天输入框、发送按钮和确认弹窗按钮
+CHAT_INPUT_SELECTOR = ', '.join([
+    '.chat-input textarea',
+    '.message-input textarea',
+    '.im-input textarea',
+    'textarea[placeholder*="输入"]',
+])
+SEND_BUTTON_SELECTOR = '.send-btn, .btn-send, button:has-text("发送")'
+CONFIRM_BUTTON_SELECTOR = 'button:has-text("确认"), button:has-text("确定")'
+
+# 从职位链接中提取 job_id：最后一个 /job/ 之后、第一个 . 或 ? 之前
+_RE_JOB_ID = re.compile(r'.*/job/([^.?]*)')
+
+# 在页面内一次性提取所有职位卡片，避免逐个元素调用 query_selector/inner_text 往返；
+# 参数为按优先级排列的卡片选择器，使用第一个能匹配到卡片的选择器，职位链接同样按优先级依次尝试；
+# 文本中的换行和连续空白在页面内合并为一个空格
+JOB_CARDS_SCRIPT = """(selectors) => {
+    const selector = selectors.find(s => document.querySelector(s));
+    if (!selector) return {selector: '', cards: []};
+    const cards = Array.from(document.querySelectorAll(selector), card => {
+        const link = ['a.ellipsis-1', '.job-title-box a', 'a[href*="/job/"]']
+            .map(s => card.querySelector(s)).find(Boolean);
+        if (!link) return null;
+        const clean = (s) => s.replace(/\s+/g, ' ').trim();
+        const text = (s) => clean(card.querySelector(s)?.innerText || '');
+        return {
+            href: link.getAttribute('href') || '',
+            job_name: clean(link.getAttribute('title') || link.innerText),
+            salary: text('.job-salary, .salary, span[class*="salary"]'),
+            company: text('.company-name a, .company-name, a[href*="/company/"]'),
+            location: text('.job-dq, .area, [class*="city"]')
+        };
+    });
+    return {selector, cards};
+}"""
+
+# 备用：提取页面中所有职位链接，返回 [href, 文字]，文字过短的（图标、"更多"等）在页面内直接丢弃
+JOB_LINKS_SCRIPT = """() => Array.from(document.querySelectorAll('a[href*="/job/"]'),
+    a => [a.getAttribute('href') || '', a.innerText.trim()]
+).filter(([href, text]) => href && text.length >= 2)"""
+
+
+def extract_job_id(href: str) -> str:
+    """从职位链接中提取 job_id，无法识别时返回空字符串"""
+    match = _RE_JOB_ID.match(href)
+    return match.group(1) if match else ''
+
+
 class LiepinPlatform(BasePlatform):
     """猎聘网平台实现"""
 
     name = "liepin"
+    display_name = "猎聘网"
     base_url = "https://www.liepin.com"
 
     # URL 参数映射（猎聘城市代码）
@@ -55,11 +154,14 @@ class LiepinPlatform(BasePlatform):
         }
     }
 
-    def __init__(self, page: Page, config: Dict[str, Any]):
-        super().__init__(page, config)
+    def __init__(self, page: Page, config: Dict[str, Any], rate_limiter: Optional[TokenBucket] = None):
+        super().__init__(page, config, rate_limiter)
         self.search_config = config.get('search', {})
         self.apply_config = config.get('apply', {})
-        self.greetings = config.get('greetings', [])
+        # 城市、薪资、经验、学历在一次运行中不变，URL 参数只需计算一次
+        codes = ((param_name, self.get_url_param(param_type, self.search_config.get(param_type, '')))
+                 for param_type, param_name in URL_PARAM_NAMES.items())
+        self._url_suffix = urllib.parse.urlencode([(name, code) for name, code in codes if code])
 
     def get_url_param(self, param_type: str, value: str) -> str:
         """将中文配置值转换为 URL 参数编码"""
@@ -68,54 +170,25 @@ class LiepinPlatform(BasePlatform):
 
     def build_search_url(self, keyword: str) -> str:
         """构建搜索 URL"""
-        import urllib.parse
-        base_url = f"{self.base_url}/zhaopin/"
-        params = [f"key={urllib.parse.quote(keyword)}"]
-
-        # 城市
-        city_code = self.get_url_param('city', self.search_config.get('city', ''))
-        if city_code:
-            params.append(f"dqs={city_code}")
-
-        # 薪资（猎聘使用 salaryCode，年薪）
-        salary_code = self.get_url_param('salary', self.search_config.get('salary', ''))
-        if salary_code:
-            params.append(f"salaryCode={salary_code}")
-
-        # 经验
-        exp_code = self.get_url_param('experience', self.search_config.get('experience', ''))
-        if exp_code:
-            params.append(f"workYearCode={exp_code}")
-
-        # 学历
-        degree_code = self.get_url_param('degree', self.search_config.get('degree', ''))
-        if degree_code:
-            params.append(f"eduLevel={degree_code}")
-
-        return f"{base_url}?{'&'.join(params)}"
-
-    def search_jobs(self, keyword: str) -> List[Dict[str, Any]]:
-        """搜索职位"""
-        url = self.build_search_url(keyword)
-        logger.info(f"[猎聘] 搜索关键词: {keyword}")
-        logger.info(f"[猎聘] 访问 URL: {url}")
+        url = f"{self.base_url}/zhaopin/?key={urllib.parse.quote(keyword)}"
+        return f"{url}&{self._url_suffix}" if self._url_suffix else url
 
+    def collect_search_results(self, keyword: str) -> List[Job]:
+        """等待搜索结果页加载并解析"""
         try:
             # 使用 domcontentloaded 而不是 load，避免等待所有资源
-            self.page.goto(url, wait_until='domcontentloaded', timeout=30000)
+            self.page.wait_for_load_state('domcontentloaded', timeout=30000)
         except Exception as e:
             logger.warning(f"[猎聘] 页面加载异常: {e}")
-            # 等待一下再检查页面状态
-            time.sleep(2)
-
-        time.sleep(3)  # 猎聘页面加载较慢
 
+        # 职位卡片由 parse_job_list 等待，无需固定等待
         # 检查当前 URL
         current_url = self.page.url
         logger.debug(f"[猎聘] 当前 URL: {current_url}")
 
         if self.check_login_required():
             logger.error("[猎聘] 登录状态已失效，请更新 cookie_liepin.txt")
+            self.login_expired = True
             return []
 
         jobs = self.parse_job_list()
@@ -125,237 +198,150 @@ class LiepinPlatform(BasePlatform):
 
     def check_login_required(self) -> bool:
         """检查是否需要登录"""
-        if 'login' in self.page.url or 'passport' in self.page.url:
+        url = self.page.url
+        if 'login' in url or 'passport' in url:
             return True
         # 检查是否有登录按钮
-        login_btn = self.page.query_selector('.login-btn, .btn-login, [data-nick="登录"]')
-        return login_btn is not None
+        return self.page.locator('.login-btn, .btn-login, [data-nick="登录"]').count() > 0
 
-    def parse_job_list(self) -> List[Dict[str, Any]]:
+    def parse_job_list(self) -> List[Job]:
         """解析职位列表"""
         jobs = []
 
-        # 猎聘的职位卡片选择器（2024年新版页面结构）
-        job_card_selectors = [
-            '.job-card-pc-container',
-            '.job-list-box .job-card',
-            '[class*="job-card"]',
-            '.job-detail-box',
-            'div[style*="job"]',
-        ]
-
+        # 任一候选选择器出现即可，之后在页面内按优先级选用第一个有卡片的选择器，只需一次往返
         job_cards = []
-        for selector in job_card_selectors:
-            try:
-                self.page.wait_for_selector(selector, timeout=10000)
-                job_cards = self.page.query_selector_all(selector)
-                if job_cards:
-                    logger.info(f"[猎聘] 使用选择器: {selector}, 找到 {len(job_cards)} 个卡片")
-                    break
-            except Exception:
-                continue
+        try:
+            self.page.wait_for_selector(_JOB_CARD_SELECTOR, timeout=10000)
+            result = self.page.evaluate(JOB_CARDS_SCRIPT, list(JOB_CARD_SELECTORS))
+            job_cards = result['cards']
+            if job_cards:
+                logger.info(f"[猎聘] 使用选择器: {result['selector']}, 找到 {len(job_cards)} 个卡片")
+        except Exception:
+            job_cards = []
 
         if not job_cards:
             logger.warning("[猎聘] 未找到职位列表，尝试直接解析页面链接...")
-            # 保存截图和HTML用于调试
-            from pathlib import Path
-            screenshot_path = Path(__file__).parent.parent.parent / "logs" / "liepin_debug.png"
-            html_path = Path(__file__).parent.parent.parent / "logs" / "liepin_debug.html"
-            self.page.screenshot(path=str(screenshot_path))
-            html_path.write_text(self.page.content(), encoding='utf-8')
-            logger.info(f"[猎聘] 已保存调试截图: {screenshot_path}")
-            logger.info(f"[猎聘] 已保存页面HTML: {html_path}")
+            self.save_debug_snapshot("liepin_debug", html=True)
 
             # 尝试直接找所有职位链接
             jobs = self._parse_job_links()
             return jobs
 
+        # 循环内使用的方法先绑定到局部变量
+        parse_job_card = self.parse_job_card
+        append = jobs.append
         for card in job_cards:
-            try:
-                job = self.parse_job_card(card)
-                if job:
-                    jobs.append(job)
-            except Exception as e:
-                logger.debug(f"[猎聘] 解析职位卡片失败: {e}")
+            if not card:
                 continue
+            job = parse_job_card(card)
+            if job:
+                append(job)
 
         return jobs
 
-    def _parse_job_links(self) -> List[Dict[str, Any]]:
+    def _parse_job_links(self) -> List[Job]:
         """备用方法：直接解析页面中的职位链接"""
         jobs = []
 
         # 查找所有包含 /job/ 的链接
-        links = self.page.query_selector_all('a[href*="/job/"]')
+        links = self.page.evaluate(JOB_LINKS_SCRIPT)
         seen_ids = set()
 
-        for link in links:
-            try:
-                href = link.get_attribute('href') or ''
-                if not href or '/job/' not in href:
-                    continue
-
-                # 提取 job_id
-                job_id = href.split('/job/')[-1].split('.')[0].split('?')[0]
-                if not job_id or job_id in seen_ids:
-                    continue
-                seen_ids.add(job_id)
-
-                job_name = link.inner_text().strip()
-                if not job_name or len(job_name) < 2:
-                    continue
-
-                # 确保 URL 完整
-                if not href.startswith('http'):
-                    href = f"{self.base_url}{href}"
-
-                jobs.append({
-                    'job_id': job_id,
-                    'job_name': job_name,
-                    'salary': '',
-                    'company': '',
-                    'location': '',
-                    'tags': [],
-                    'hr_name': '',
-                    'hr_title': '',
-                    'url': href,
-                    'platform': self.name
-                })
-            except Exception as e:
-                logger.debug(f"[猎聘] 解析链接失败: {e}")
+        for href, job_name in links:
+            # 提取 job_id
+            job_id = extract_job_id(href)
+            if not job_id or job_id in seen_ids:
                 continue
+            seen_ids.add(job_id)
+
+            # 确保 URL 完整
+            if not href.startswith('http'):
+                href = f"{self.base_url}{href}"
+
+            jobs.append(Job(
+                job_id=job_id,
+                job_name=job_name,
+                url=href,
+                platform=self.name
+            ))
 
         logger.info(f"[猎聘] 通过链接解析找到 {len(jobs)} 个职位")
         return jobs
 
-    def parse_job_card(self, card) -> Optional[Dict[str, Any]]:
-        """解析单个职位卡片"""
+    def parse_job_card(self, card: Dict[str, Any]) -> Optional[Job]:
+        """解析单个职位卡片（card 为 JOB_CARDS_SCRIPT 提取出的字段）"""
         try:
-            # 职位链接 - 猎聘新版页面结构
-            job_link = (
-                card.query_selector('a.ellipsis-1') or
-                card.query_selector('.job-title-box a') or
-                card.query_selector('a[href*="/job/"]')
-            )
-
-            if not job_link:
-                return None
-
-            href = job_link.get_attribute('href') or ''
+            get = card.get
+            href = get('href', '')
             # 从 href 中提取 job_id
-            job_id = ''
-            if '/job/' in href:
-                job_id = href.split('/job/')[-1].split('.')[0].split('?')[0]
+            job_id = extract_job_id(href)
 
-            # 只获取职位标题文本
-            job_name = job_link.get_attribute('title') or job_link.inner_text().strip()
-            # 清理换行和多余空格
-            job_name = ' '.join(job_name.split())
+            job_name = get('job_name', '')
 
             if not job_id or not job_name:
                 return None
 
-            # 薪资 - 猎聘通常用橙色显示
-            salary_el = card.query_selector('.job-salary, .salary, span[class*="salary"]')
-            salary = salary_el.inner_text().strip() if salary_el else ''
-
-            # 公司名称
-            company_el = card.query_selector('.company-name a, .company-name, a[href*="/company/"]')
-            company = company_el.inner_text().strip() if company_el else ''
-            company = ' '.join(company.split())  # 清理换行
-
-            # 公司位置
-            location_el = card.query_selector('.job-dq, .area, [class*="city"]')
-            location = location_el.inner_text().strip() if location_el else ''
-
             # 确保 URL 完整
             if href and not href.startswith('http'):
                 href = f"{self.base_url}{href}"
 
-            return {
-                'job_id': job_id,
-                'job_name': job_name,
-                'salary': salary,
-                'company': company,
-                'location': location,
-                'tags': [],
-                'hr_name': '',
-                'hr_title': '',
-                'url': href,
-                'platform': self.name
-            }
+            return Job(
+                job_id=job_id,
+                job_name=job_name,
+                salary=get('salary', ''),
+                company=get('company', ''),
+                location=get('location', ''),
+                url=href,
+                platform=self.name
+            )
         except Exception as e:
             logger.debug(f"[猎聘] 解析职位卡片异常: {e}")
             return None
 
-    def apply_job(self, job: Dict[str, Any]) -> bool:
+    def apply_job(self, job: Job) -> bool:
         """投递职位"""
-        url = job.get('url', '')
+        url = job.url
         if not url:
             return False
 
         try:
-            self.page.goto(url, wait_until='domcontentloaded', timeout=30000)
+            self.open_job_page(url, wait_until='domcontentloaded', timeout=30000)
         except Exception as e:
             logger.warning(f"[猎聘] 页面加载异常: {e}")
 
-        time.sleep(3)
-
-        from pathlib import Path
-
-        # 猎聘职位详情页的"聊一聊"按钮选择器
-        # 优先找大的橙色按钮，在页面右上角
-        apply_btn_selectors = [
-            'button:has-text("聊一聊")',
-            'a:has-text("聊一聊")',
-            '.job-apply-btn',
-            '.btn-chat',
-            'button:has-text("立即沟通")',
-            'button:has-text("投递简历")',
-        ]
+        # 等待任一投递按钮出现，替代固定等待
+        try:
+            self.page.wait_for_selector(_APPLY_BUTTON_SELECTOR, state='visible', timeout=8000)
+        except PlaywrightTimeoutError:
+            pass
 
-        apply_btn = None
-        for selector in apply_btn_selectors:
-            try:
-                btns = self.page.query_selector_all(selector)
-                for btn in btns:
-                    if btn.is_visible():
-                        btn_text = btn.inner_text().strip()
-                        # 确保是真正的按钮，不是包含太多文字的容器
-                        if len(btn_text) < 20 and ('聊' in btn_text or '沟通' in btn_text or '投递' in btn_text):
-                            apply_btn = btn
-                            logger.info(f"[猎聘] 找到按钮: '{btn_text}'")
-                            break
-                if apply_btn:
-                    break
-            except Exception:
-                continue
+        try:
+            apply_btn = self.page.evaluate_handle(APPLY_BUTTON_SCRIPT, APPLY_BUTTON_CANDIDATES).as_element()
+        except Exception:
+            apply_btn = None
 
         if not apply_btn:
-            # 保存截图调试
-            screenshot_path = Path(__file__).parent.parent.parent / "logs" / "liepin_apply_debug.png"
-            self.page.screenshot(path=str(screenshot_path))
-            logger.warning(f"[猎聘] 未找到投递按钮，已保存截图: {screenshot_path}")
+            logger.warning("[猎聘] 未找到投递按钮")
+            self.save_debug_snapshot("liepin_apply_debug")
             return False
 
         try:
             btn_text = apply_btn.inner_text().strip()
+            logger.info(f"[猎聘] 找到按钮: '{btn_text}'")
 
             if '已投递' in btn_text or '已沟通' in btn_text or '已申请' in btn_text:
                 logger.debug("[猎聘] 已投递过，跳过")
+                self.contacted_ids.add(job.job_id)
                 return False
 
-            # 保存点击前截图
-            screenshot_path = Path(__file__).parent.parent.parent / "logs" / "liepin_before_click.png"
-            self.page.screenshot(path=str(screenshot_path))
-
             apply_btn.click()
-            time.sleep(3)
-
-            # 保存点击后截图
-            screenshot_path = Path(__file__).parent.parent.parent / "logs" / "liepin_after_click.png"
-            self.page.screenshot(path=str(screenshot_path))
-            logger.info(f"[猎聘] 已保存点击后截图")
+            # 点击后可能进入聊天页面，也可能弹出确认框，等待其中之一出现
+            try:
+                self.page.wait_for_selector(
+                    f"{CHAT_INPUT_SELECTOR}, {CONFIRM_BUTTON_SELECTOR}", state='visible', timeout=5000
+                )
+            except PlaywrightTimeoutError:
+                pass
 
             # 检查是否进入聊天页面或有弹窗
             # 猎聘点击聊一聊后可能直接进入聊天界面
@@ -366,59 +352,54 @@ class LiepinPlatform(BasePlatform):
                 return self.send_greeting(job)
 
             # 检查是否有确认弹窗
-            confirm_btn = self.page.query_selector('button:has-text("确认"), button:has-text("确定")')
-            if confirm_btn and confirm_btn.is_visible():
+            confirm_btn = self.page.locator(CONFIRM_BUTTON_SELECTOR).first
+            if confirm_btn.is_visible():
                 logger.info("[猎聘] 找到确认按钮，点击...")
                 confirm_btn.click()
-                time.sleep(2)
+                # 弹窗关闭说明已确认
+                try:
+                    confirm_btn.wait_for(state='hidden', timeout=3000)
+                except PlaywrightTimeoutError:
+                    pass
+            else:
+                # 既没有进入聊天页面也没有确认弹窗，保存点击后的页面用于排查
+                self.save_debug_snapshot("liepin_after_click")
 
             return True
         except Exception as e:
             logger.error(f"[猎聘] 点击投递按钮失败: {e}")
+            self.save_debug_snapshot("liepin_after_click")
             return False
 
-    def send_greeting(self, job: Dict[str, Any] = None) -> bool:
+    def send_greeting(self, job: Optional[Job] = None) -> bool:
         """发送打招呼消息"""
         if not self.greetings:
             logger.warning("[猎聘] 未配置打招呼模板")
             return True
 
-        greeting = random.choice(self.greetings)
-
-        if job:
-            greeting = greeting.replace('{position}', job.get('job_name', ''))
-            greeting = greeting.replace('{company}', job.get('company', ''))
+        greeting = self.pick_greeting(job)
 
-        # 猎聘的聊天输入框选择器
-        input_selectors = [
-            '.chat-input textarea',
-            '.message-input textarea',
-            '.im-input textarea',
-            'textarea[placeholder*="输入"]'
-        ]
-
-        input_box = None
-        for selector in input_selectors:
-            input_box = self.page.query_selector(selector)
-            if input_box:
-                break
+        # 等待聊天输入框出现（多个候选合并为一个选择器），直接使用返回的元素
+        try:
+            input_box = self.page.wait_for_selector(CHAT_INPUT_SELECTOR, timeout=5000)
+        except PlaywrightTimeoutError:
+            input_box = None
 
         if input_box:
             input_box.fill(greeting)
-            time.sleep(0.5)
-
-            send_selectors = [
-                '.send-btn',
-                '.btn-send',
-                'button:has-text("发送")'
-            ]
-
-            for selector in send_selectors:
-                send_btn = self.page.query_selector(selector)
-                if send_btn:
-                    send_btn.click()
-                    time.sleep(1)
-                    logger.debug(f"[猎聘] 已发送打招呼: {greeting[:30]}...")
-                    return True
+
+            try:
+                send_btn = self.page.wait_for_selector(SEND_BUTTON_SELECTOR, state='visible', timeout=3000)
+            except PlaywrightTimeoutError:
+                send_btn = None
+
+            if send_btn:
+                send_btn.click()
+                # 输入框被清空说明消息已发出
+                try:
+                    self.page.wait_for_function('el => !el.value', arg=input_box, timeout=3000)
+                except PlaywrightTimeoutError:
+                    pass
+                logger.debug(f"[猎聘] 已发送打招呼: {greeting[:30]}...")
 
         return True
@@ -1,10 +1,20 @@
+import atexit
+import signal
+import sys
 from datetime import datetime
+from typing import Dict
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
+from .browser import BrowserManager
 from .utils.config import Config
 from .utils.logger import logger
 
 
+# 定时任务错过触发时间后仍允许补执行的秒数
+MISFIRE_GRACE_TIME = 300
+
+
 class JobScheduler:
     """定时任务调度器"""
 
@@ -18,8 +28,18 @@ class JobScheduler:
         """
         self.config = config
         self.job_func = job_func
-        self.scheduler = BlockingScheduler()
+        # 各次运行共用浏览器和投递记录，只用一个工作线程串行执行；
+        # 平台之间的并发由各自的浏览器线程负责。上一次运行未结束时到点的任务合并为一次，
+        # 错过（如电脑休眠）不超过 5 分钟的任务仍会补执行
+        self.scheduler = BlockingScheduler(
+            executors={'default': ThreadPoolExecutor(max_workers=1)},
+            job_defaults={'coalesce': True, 'max_instances': 1, 'misfire_grace_time': MISFIRE_GRACE_TIME}
+        )
         self.schedule_config = config.schedule
+        # 按平台缓存浏览器管理器，多次定时执行之间复用同一个浏览器进程
+        self.browser_managers: Dict[str, BrowserManager] = {}
+        # 异常退出时也关闭浏览器（正常退出时已关闭，字典为空）
+        atexit.register(self.close_browsers)
 
     def setup(self) -> None:
         """设置定时任务"""
@@ -71,9 +91,13 @@ class JobScheduler:
                 weekend_limit = self.schedule_config.get('weekend_limit', 10)
                 logger.info(f"周末模式，投递上限: {weekend_limit}")
                 # 可以在这里修改投递限制
-                self.job_func(weekend_mode=True, weekend_limit=weekend_limit)
+                self.job_func(
+                    weekend_mode=True,
+                    weekend_limit=weekend_limit,
+                    browser_managers=self.browser_managers
+                )
             else:
-                self.job_func()
+                self.job_func(browser_managers=self.browser_managers)
         except Exception as e:
             logger.error(f"定时任务执行失败: {e}")
 
@@ -89,12 +113,29 @@ class JobScheduler:
         logger.info("定时调度器启动，等待执行...")
         logger.info("按 Ctrl+C 停止")
 
+        # SIGTERM 与 Ctrl+C 一样走正常退出流程，保证浏览器被关闭
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
         try:
             self.scheduler.start()
         except (KeyboardInterrupt, SystemExit):
             logger.info("调度器已停止")
+        finally:
+            self.close_browsers()
+
+    def close_browsers(self) -> None:
+        """关闭所有复用的浏览器"""
+        for platform_name, browser_manager in self.browser_managers.items():
+            try:
+                browser_manager.shutdown()
+            except Exception as e:
+                logger.error(f"关闭 {platform_name} 浏览器失败: {e}")
+        self.browser_managers.clear()
 
     def run_once(self) -> None:
         """立即执行一次（用于测试）"""
         logger.info("手动触发执行...")
-        self._wrapped_job()
+        try:
+            self._wrapped_job()
+        finally:
+            self.close_browsers()
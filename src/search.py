@@ -1,18 +1,30 @@
 import time
+import random
 from typing import List, Dict, Any, Optional
 from playwright.sync_api import Page
+from .models import Job
+from .platforms.base import DEBUG_DIR, DEFAULT_SEARCH_CONCURRENCY, search_in_tab_pool
+from .platforms.boss import JOB_CARDS_SCRIPT, extract_job_id
 from .utils.config import Config
 from .utils.logger import logger
 
 
+# 不做页面内预过滤的过滤条件
+NO_CARD_FILTER = {'companies': [], 'companyKeywords': [], 'excludeKeywords': []}
+
+
 class JobSearcher:
     """职位搜索类"""
 
     def __init__(self, page: Page, config: Config):
         self.page = page
         self.config = config
+        # 检测到登录失效后置为 True，不再继续搜索剩余关键词
+        self.login_expired = False
+        # 错开标签页请求用的随机数生成器，不共享全局随机状态
+        self._rng = random.Random()
 
-    def search_jobs(self, keyword: str) -> List[Dict[str, Any]]:
+    def search_jobs(self, keyword: str) -> List[Job]:
         """
         搜索职位
 
@@ -22,16 +34,26 @@ class JobSearcher:
         Returns:
             职位列表
         """
+        self._start_search(keyword, self.page)
+        return self._collect_results()
+
+    def _start_search(self, keyword: str, page: Page) -> None:
+        """在指定页面打开搜索结果页（只等待导航提交）"""
         url = self.config.build_search_url(keyword)
         logger.info(f"搜索关键词: {keyword}")
         logger.info(f"访问 URL: {url}")
 
-        self.page.goto(url)
-        time.sleep(2)  # 等待页面加载
+        page.goto(url, wait_until='commit')
+
+    def _collect_results(self) -> List[Job]:
+        """等待当前页面加载完成并解析搜索结果"""
+        # 职位列表由 _parse_job_list 等待，这里只需 DOM 就绪即可检查登录状态
+        self.page.wait_for_load_state('domcontentloaded')
 
         # 检查是否需要登录
         if self._check_login_required():
             logger.error("登录状态已失效，请更新 cookie.txt")
+            self.login_expired = True
             return []
 
         jobs = self._parse_job_list()
@@ -46,10 +68,9 @@ class JobSearcher:
             return True
 
         # 检查页面是否有登录提示
-        login_btn = self.page.query_selector('.btn-sign')
-        return login_btn is not None
+        return self.page.locator('.btn-sign').count() > 0
 
-    def _parse_job_list(self) -> List[Dict[str, Any]]:
+    def _parse_job_list(self) -> List[Job]:
         """解析职位列表"""
         jobs = []
 
@@ -58,101 +79,69 @@ class JobSearcher:
             self.page.wait_for_selector('.job-card-wrap', timeout=10000)
         except Exception:
             logger.warning("未找到职位列表，可能没有匹配的职位或页面结构已变化")
-            # 保存截图用于调试
-            from pathlib import Path
-            screenshot_path = Path(__file__).parent.parent / "logs" / "debug_screenshot.png"
-            self.page.screenshot(path=str(screenshot_path))
-            logger.info(f"已保存调试截图: {screenshot_path}")
-            # 保存页面 HTML
-            html_path = Path(__file__).parent.parent / "logs" / "debug_page.html"
-            html_path.write_text(self.page.content(), encoding='utf-8')
-            logger.info(f"已保存页面 HTML: {html_path}")
+            # 调试模式下保存截图和页面 HTML
+            if self.config.debug:
+                screenshot_path = DEBUG_DIR / "debug_screenshot.png"
+                self.page.screenshot(path=str(screenshot_path))
+                logger.info(f"已保存调试截图: {screenshot_path}")
+                html_path = DEBUG_DIR / "debug_page.html"
+                html_path.write_text(self.page.content(), encoding='utf-8')
+                logger.info(f"已保存页面 HTML: {html_path}")
             return []
 
-        job_cards = self.page.query_selector_all('.job-card-wrap')
+        # 一次性提取所有职位卡片（与 Boss 平台共用提取脚本，不做预过滤）
+        job_cards = self.page.evaluate(JOB_CARDS_SCRIPT, NO_CARD_FILTER)
 
         for card in job_cards:
-            try:
-                job = self._parse_job_card(card)
-                if job:
-                    jobs.append(job)
-            except Exception as e:
-                logger.debug(f"解析职位卡片失败: {e}")
+            if not card:
                 continue
+            job = self._parse_job_card(card)
+            if job:
+                jobs.append(job)
 
         return jobs
 
-    def _parse_job_card(self, card) -> Optional[Dict[str, Any]]:
-        """解析单个职位卡片"""
+    def _parse_job_card(self, card: Dict[str, Any]) -> Optional[Job]:
+        """解析单个职位卡片（card 为 JOB_CARDS_SCRIPT 提取出的字段）"""
         try:
-            # 职位链接和 ID
-            job_link = card.query_selector('.job-name')
-            if not job_link:
-                return None
-
-            href = job_link.get_attribute('href') or ''
-            # 从 href 中提取 job_id，格式如：/job_detail/xxx.html
-            job_id = href.split('/')[-1].replace('.html', '') if href else ''
-
-            # 职位名称
-            job_name = job_link.inner_text().strip() if job_link else ''
-
-            # 薪资
-            salary_el = card.query_selector('.job-salary')
-            salary = salary_el.inner_text().strip() if salary_el else ''
-
-            # 公司名称
-            company_el = card.query_selector('.boss-name')
-            company = company_el.inner_text().strip() if company_el else ''
-
-            # 公司位置
-            location_el = card.query_selector('.company-location')
-            location = location_el.inner_text().strip() if location_el else ''
-
-            # 职位标签（经验、学历等）
-            tags = []
-            tag_elements = card.query_selector_all('.tag-list li')
-            tags = [t.inner_text().strip() for t in tag_elements]
-
-            return {
-                'job_id': job_id,
-                'job_name': job_name,
-                'salary': salary,
-                'company': company,
-                'location': location,
-                'tags': tags,
-                'hr_name': '',  # 列表页没有 HR 名字
-                'hr_title': '',
-                'url': f"https://www.zhipin.com{href}" if href else ''
-            }
+            href = card.get('href', '')
+            job_id = extract_job_id(href)
+
+            return Job(
+                job_id=job_id,
+                job_name=card.get('job_name', ''),
+                salary=card.get('salary', ''),
+                company=card.get('company', ''),
+                location=card.get('location', ''),
+                tags=card.get('tags', []),
+                url=f"https://www.zhipin.com{href}" if href else ''
+            )
         except Exception as e:
             logger.debug(f"解析职位卡片异常: {e}")
             return None
 
-    def search_all_keywords(self) -> List[Dict[str, Any]]:
+    def search_all_keywords(self) -> List[Job]:
         """
-        搜索所有关键词
+        搜索所有关键词（标签页工作池见 search_in_tab_pool）
 
         Returns:
             所有职位列表（已去重）
         """
-        keywords = self.config.search.get('keywords', [])
-        all_jobs = []
-        seen_ids = set()
+        main_page = self.page
 
-        for keyword in keywords:
-            jobs = self.search_jobs(keyword)
+        def collect(keyword: str, page: Page) -> List[Job]:
+            # 解析方法都作用于 self.page，切换到对应标签页
+            self.page = page
+            return self._collect_results()
 
-            for job in jobs:
-                if job['job_id'] not in seen_ids:
-                    seen_ids.add(job['job_id'])
-                    all_jobs.append(job)
-
-            # 关键词之间等待，避免请求过快
-            time.sleep(2)
-
-        logger.info(f"所有关键词搜索完成，共找到 {len(all_jobs)} 个不重复职位")
-        return all_jobs
+        try:
+            return search_in_tab_pool(
+                'boss', main_page, self.config.search.get('keywords', []),
+                self.config.search.get('max_concurrency', DEFAULT_SEARCH_CONCURRENCY),
+                self._start_search, collect, lambda: self.login_expired, self._rng
+            )
+        finally:
+            self.page = main_page
 
     def get_next_page(self) -> bool:
         """
@@ -161,8 +150,8 @@ class JobSearcher:
         Returns:
             是否成功翻页
         """
-        next_btn = self.page.query_selector('.ui-icon-arrow-right')
-        if next_btn and not next_btn.is_disabled():
+        next_btn = self.page.locator('.ui-icon-arrow-right').first
+        if next_btn.count() and not next_btn.is_disabled():
             next_btn.click()
             time.sleep(2)
             return True
@@ -0,0 +1,66 @@
+import hashlib
+import math
+import struct
+from typing import List
+
+
+class BloomFilter:
+    """
+    布隆过滤器
+
+    只能回答"一定不存在"或"可能存在"，用于在查询持久化数据前快速排除新元素。
+    """
+
+    _HEADER = struct.Struct('<QI')
+
+    def __init__(self, capacity: int = 10000, error_rate: float = 0.01):
+        """
+        Args:
+            capacity: 预计元素数量
+            error_rate: 期望误判率
+        """
+        capacity = max(1, capacity)
+        # 位数 m = -n·ln(p) / (ln2)²，哈希次数 k = m/n·ln2
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> List[int]:
+        """双重哈希计算 k 个位下标"""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str) -> None:
+        """添加元素"""
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def fill_ratio(self) -> float:
+        """已置位的比例；按设计容量装满时约为 0.5，超过后误判率迅速上升"""
+        return int.from_bytes(self.bits, 'little').bit_count() / self.size
+
+    def to_bytes(self) -> bytes:
+        """序列化为字节"""
+        return self._HEADER.pack(self.size, self.hash_count) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'BloomFilter':
+        """从字节反序列化，数据不完整时抛出 ValueError"""
+        if len(data) < cls._HEADER.size:
+            raise ValueError("布隆过滤器数据不完整")
+
+        size, hash_count = cls._HEADER.unpack_from(data)
+        bits = data[cls._HEADER.size:]
+        if size <= 0 or hash_count <= 0 or len(bits) != (size + 7) // 8:
+            raise ValueError("布隆过滤器数据不完整")
+
+        bloom = cls.__new__(cls)
+        bloom.size = size
+        bloom.hash_count = hash_count
+        bloom.bits = bytearray(bits)
+        return bloom
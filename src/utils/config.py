@@ -1,6 +1,21 @@
 import yaml
+from functools import cached_property, lru_cache
+from urllib.parse import quote, urlencode
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+# 优先使用 libyaml 的 C 解析器，未编译 libyaml 时退回纯 Python 实现
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+
+@lru_cache(maxsize=16)
+def _load_yaml(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """解析 YAML 文件，以修改时间作为缓存键，文件未变化时直接复用解析结果"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=YamlLoader) or {}
 
 
 class Config:
@@ -11,13 +26,17 @@ class Config:
         self.config_path = Path(config_path) if config_path else self.base_dir / "config.yaml"
 
         self._config: Dict[str, Any] = {}
+        # 解析后的 Cookie 缓存，键为 (平台, 域名)
+        self._cookies: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
         self._load()
 
     def _load(self) -> None:
         """加载配置文件"""
-        if self.config_path.exists():
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                self._config = yaml.safe_load(f) or {}
+        try:
+            mtime_ns = self.config_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        self._config = _load_yaml(str(self.config_path), mtime_ns)
 
     @property
     def enabled_platforms(self) -> List[str]:
@@ -26,36 +45,75 @@ class Config:
 
     def get_platform_config(self, platform: str) -> Dict[str, Any]:
         """获取指定平台的完整配置"""
-        platform_config = self._config.get(platform, {})
+        # 解析结果在多个 Config 实例间共享，复制后再合并，避免修改缓存
+        platform_config = dict(self._config.get(platform, {}))
         # 合并通用配置
         platform_config['greetings'] = self.greetings
+        platform_config['debug'] = self.debug
         return platform_config
 
+    def get_cookie_path(self, platform: str) -> Path:
+        """获取指定平台的 Cookie 文件路径"""
+        if platform == 'boss':
+            return self.base_dir / "cookie.txt"
+        return self.base_dir / f"cookie_{platform}.txt"
+
     def get_cookie(self, platform: str) -> str:
         """获取指定平台的 Cookie"""
-        if platform == 'boss':
-            cookie_file = self.base_dir / "cookie.txt"
-        else:
-            cookie_file = self.base_dir / f"cookie_{platform}.txt"
-
-        if cookie_file.exists():
-            with open(cookie_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                cookie_lines = [line.strip() for line in lines
-                               if line.strip() and not line.strip().startswith('#')]
-                return cookie_lines[0] if cookie_lines else ""
+        cookie_file = self.get_cookie_path(platform)
+
+        try:
+            content = cookie_file.read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return ""
+
+        # 取第一行非空、非注释的内容
+        for line in content.splitlines():
+            line = line.strip()
+            if line and not line.startswith('#'):
+                return line
         return ""
 
+    def get_cookies(self, platform: str, domain: str) -> List[Dict[str, str]]:
+        """
+        获取指定平台解析后的 Cookie 列表（可直接传给 context.add_cookies），解析结果会缓存
+
+        Args:
+            platform: 平台名称
+            domain: Cookie 所属域名
+
+        Returns:
+            Cookie 列表
+        """
+        key = (platform, domain)
+        if key not in self._cookies:
+            self._cookies[key] = [
+                {'name': name.strip(), 'value': value.strip(), 'domain': domain, 'path': '/'}
+                for name, sep, value in (item.partition('=') for item in self.get_cookie(platform).split(';'))
+                if sep
+            ]
+        return self._cookies[key]
+
     @property
     def greetings(self) -> List[str]:
         """获取打招呼模板列表"""
         return self._config.get('greetings', [])
 
+    @property
+    def debug(self) -> bool:
+        """是否开启调试模式（失败时保存页面截图和 HTML）"""
+        return bool(self._config.get('debug', False))
+
     @property
     def schedule(self) -> Dict[str, Any]:
         """获取定时任务配置"""
         return self._config.get('schedule', {})
 
+    @property
+    def browser(self) -> Dict[str, Any]:
+        """获取浏览器配置"""
+        return self._config.get('browser', {})
+
     # 兼容旧接口
     @property
     def search(self) -> Dict[str, Any]:
@@ -77,29 +135,23 @@ class Config:
         """获取 Boss Cookie（兼容旧代码）"""
         return self.get_cookie('boss')
 
-    def build_search_url(self, keyword: str) -> str:
-        """构建 Boss 搜索 URL（兼容旧代码）"""
+    @cached_property
+    def _boss_search_params(self) -> List[Tuple[str, str]]:
+        """Boss 搜索的城市、薪资等 URL 参数，只计算一次"""
+        # 平台模块依赖本模块，在这里延迟导入避免循环依赖
         from ..platforms.boss import BossPlatform
-        base_url = "https://www.zhipin.com/web/geek/jobs"
-        params = [f"query={keyword}"]
-
         search = self.search
         url_params = BossPlatform.URL_PARAMS
 
-        city_code = url_params['city'].get(search.get('city', ''), '')
-        if city_code:
-            params.append(f"city={city_code}")
-
-        salary_code = url_params['salary'].get(search.get('salary', ''), '')
-        if salary_code:
-            params.append(f"salary={salary_code}")
+        params = []
+        for param_type in ('city', 'salary', 'experience', 'degree'):
+            code = url_params[param_type].get(search.get(param_type, ''), '')
+            if code:
+                params.append((param_type, code))
+        return params
 
-        exp_code = url_params['experience'].get(search.get('experience', ''), '')
-        if exp_code:
-            params.append(f"experience={exp_code}")
-
-        degree_code = url_params['degree'].get(search.get('degree', ''), '')
-        if degree_code:
-            params.append(f"degree={degree_code}")
-
-        return f"{base_url}?{'&'.join(params)}"
+    def build_search_url(self, keyword: str) -> str:
+        """构建 Boss 搜索 URL（兼容旧代码）"""
+        base_url = "https://www.zhipin.com/web/geek/jobs"
+        params = [('query', keyword)] + self._boss_search_params
+        return f"{base_url}?{urlencode(params, quote_via=quote)}"
@@ -1,8 +1,11 @@
 import logging
 import os
-from datetime import datetime
+from logging.handlers import TimedRotatingFileHandler
 from pathlib import Path
 
+# 保留的历史日志天数
+LOG_BACKUP_DAYS = 30
+
 
 def setup_logger(name: str = "boss_rob") -> logging.Logger:
     """设置日志器，同时输出到控制台和文件"""
@@ -17,8 +20,8 @@ def setup_logger(name: str = "boss_rob") -> logging.Logger:
     log_dir = Path(__file__).parent.parent.parent / "logs"
     log_dir.mkdir(exist_ok=True)
 
-    # 日志文件名：按日期
-    log_file = log_dir / f"{datetime.now().strftime('%Y-%m-%d')}.log"
+    # 日志文件：每天零点轮转，历史日志命名为 {name}.log.YYYY-MM-DD
+    log_file = log_dir / f"{name}.log"
 
     # 格式
     formatter = logging.Formatter(
@@ -31,8 +34,10 @@ def setup_logger(name: str = "boss_rob") -> logging.Logger:
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
 
-    # 文件处理器
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    # 文件处理器：delay=True 推迟到第一条日志时才打开文件；定时任务跨天运行时自动切换到新文件
+    file_handler = TimedRotatingFileHandler(
+        log_file, when='midnight', backupCount=LOG_BACKUP_DAYS, encoding='utf-8', delay=True
+    )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(formatter)
 
@@ -0,0 +1,41 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    令牌桶限流器
+
+    以固定速率补充令牌，允许不超过容量的突发请求，用于限制对目标站点的访问频率。
+    """
+
+    def __init__(self, rate: float = 1.0, capacity: int = 5):
+        """
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 令牌桶容量（允许的最大突发请求数）
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        取一个令牌，令牌不足时阻塞等待
+
+        Returns:
+            等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # 先预占令牌再等待，并发调用时按顺序排队
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            self._tokens -= 1
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
@@ -1,7 +1,50 @@
+import bisect
 import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime, date
-from typing import Dict, List, Any, Optional
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+from .bloom import BloomFilter
+
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时使用标准库 json
+    orjson = None
+
+# 两者都直接接受 bytes（标准库会自动识别 UTF-8）
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# 标准库编码器（orjson 不可用时使用），共享实例避免每次调用重新创建
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2)
+_JSON_LINE_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+
+def _json_line(obj: Any) -> bytes:
+    """编码为一行 JSON（追加日志用）"""
+    if orjson is not None:
+        return orjson.dumps(obj) + b'\n'
+    return _JSON_LINE_ENCODER.encode(obj).encode('utf-8') + b'\n'
+
+
+# 已投递文件的顶层键（本模块写出的 JSON 均为 2 空格缩进，每个职位一行 `  "job_id": {`），
+# 查重时只需提取 job_id，不必解析出整个字典
+_RE_TOP_LEVEL_KEY = re.compile(rb'^  "((?:[^"\\\n]|\\.)*)": \{', re.MULTILINE)
+# 超过该大小的文件用 mmap 扫描，不整体读入内存
+MMAP_THRESHOLD = 1 << 20
+
+# 布隆过滤器文件头：已投递快照的 (修改时间, 大小) 和追加日志的大小，用于校验是否同步
+_FINGERPRINT = struct.Struct('<QQQ')
+# 已投递布隆过滤器：最小容量、误判率；置位比例超过上限（超出设计容量）时按当前数量重建
+APPLIED_BLOOM_MIN_CAPACITY = 10000
+APPLIED_BLOOM_ERROR_RATE = 0.001
+APPLIED_BLOOM_MAX_FILL = 0.5
+# 追加日志超过该大小且大于快照时合并进快照
+LOG_COMPACT_MIN_SIZE = 64 * 1024
 
 
 class Storage:
@@ -15,125 +58,423 @@ class Storage:
         # 按平台分离数据文件
         prefix = f"{platform}_" if platform != "boss" else ""
         self.applied_jobs_file = self.data_dir / f"{prefix}applied_jobs.json"
+        # 已投递记录的追加日志：每次投递只追加一行，加载时在快照之上重放
+        self.applied_jobs_log = self.data_dir / f"{prefix}applied_jobs.jsonl"
         self.blacklist_file = self.data_dir / f"{prefix}blacklist.json"
         self.hr_records_file = self.data_dir / f"{prefix}hr_records.json"
         self.daily_stats_file = self.data_dir / f"{prefix}daily_stats.json"
+        # 今日投递计数（"日期 数量"），每次投递只写这个小文件，跨天或下次加载时合并进每日统计
+        self.today_count_file = self.data_dir / f"{prefix}today_count.txt"
+        self.applied_bloom_file = self.data_dir / f"{prefix}applied.bloom"
 
-        # 内存缓存：只缓存 job_id 集合，用于快速查重
+        # 内存缓存：数据文件只在首次使用时读取，之后修改缓存并整体写回
+        self._applied_jobs: Optional[Dict[str, Dict[str, Any]]] = None
         self._applied_job_ids: Optional[set] = None
-        self._blacklist_cache: Optional[Dict[str, List[str]]] = None
+        self._hr_records: Optional[Dict[str, Dict[str, Any]]] = None
+        # 已解析的 HR 最后联系时间，避免每次检查都重新解析字符串
+        self._hr_last_contact: Dict[str, datetime] = {}
+        # 按最后联系时间排序的 (时间, HR ID)，首次批量查询时建立
+        self._hr_contact_index: Optional[List[Tuple[datetime, str]]] = None
+        self._daily_stats: Optional[Dict[str, Dict[str, int]]] = None
+        # 今日统计行的直接引用，跨天时切换
+        self._today: Optional[date] = None
+        self._today_row: Optional[Dict[str, int]] = None
+        # 布隆过滤器：大部分职位从未投递过，命中前无需加载已投递文件
+        self._applied_bloom: Optional[BloomFilter] = None
+        # 黑名单读多写少，用 frozenset 缓存，添加时整体替换
+        self._blacklist_companies: Optional[frozenset] = None
+        self._blacklist_hr_ids: Optional[frozenset] = None
+
+        # 批量模式（batched）下只记录待写入的文件，退出时统一写入
+        self.buffered = False
+        self._dirty: Dict[Path, Any] = {}
+        self._pending_log: List[bytes] = []
+        self._bloom_dirty = False
+        self._today_count_dirty = False
+        self._today_count_stale = False
 
     def _load_json(self, file_path: Path) -> Any:
-        """加载 JSON 文件"""
-        if file_path.exists():
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return None
+        """加载 JSON 文件，文件不存在时返回 None"""
+        # 直接读取，不存在时捕获异常，省去一次 exists() 的 stat 调用
+        try:
+            data = file_path.read_bytes()
+        except FileNotFoundError:
+            return None
+        # 一次读入全部字节再解析，避免逐块读取
+        return _json_loads(data)
 
     def _save_json(self, file_path: Path, data: Any) -> None:
-        """保存 JSON 文件"""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        """保存 JSON 文件（整体编码后一次写入；批量模式下推迟到 flush）"""
+        if self.buffered:
+            self._dirty[file_path] = data
+            return
+
+        content = None
+        if orjson is not None:
+            # 数据文件的键都是字符串，不开启较慢的 OPT_NON_STR_KEYS；遇到非字符串键时交给标准库处理
+            try:
+                content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+            except TypeError:
+                content = None
+        if content is None:
+            content = _JSON_ENCODER.encode(data).encode('utf-8')
+        self._write_atomic(file_path, content)
+
+    def flush(self) -> None:
+        """写入批量模式下推迟的所有文件"""
+        dirty, self._dirty = self._dirty, {}
+        for file_path, data in dirty.items():
+            self._save_json(file_path, data)
+        # 过期的今日计数文件已合并进刚写入的每日统计，此时才能删除（须在写入新的计数文件之前）
+        if self._today_count_stale:
+            self._today_count_stale = False
+            self.today_count_file.unlink(missing_ok=True)
+        if self._today_count_dirty:
+            self._today_count_dirty = False
+            self._save_today_count()
+        if self._pending_log:
+            lines, self._pending_log = b''.join(self._pending_log), []
+            self._append_applied_log(lines)
+            self._maybe_compact_applied_log()
+        # 布隆过滤器记录的是已投递文件写入后的指纹，必须在其之后保存
+        if self._bloom_dirty:
+            self._bloom_dirty = False
+            self._save_applied_bloom()
+
+    @contextmanager
+    def batched(self) -> Iterator['Storage']:
+        """
+        批量修改：期间的写入只在内存中进行，退出时每个文件只写一次
+
+        Example:
+            with storage.batched():
+                storage.add_applied_jobs(records)
+                storage.increment_today_apply_count(len(records))
+        """
+        if self.buffered:
+            yield self
+            return
+
+        self.buffered = True
+        try:
+            yield self
+        finally:
+            self.buffered = False
+            self.flush()
+
+    @staticmethod
+    def _write_atomic(file_path: Path, content: bytes) -> None:
+        """
+        先写临时文件再替换，写入中途退出不会损坏原文件
+
+        临时文件名唯一（同目录下，保证 os.replace 是原子的），
+        定时任务和手动运行同时写同一文件时不会互相覆盖半写的临时文件；无需每次 fsync。
+        """
+        fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, prefix=file_path.name + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_name, file_path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
 
     # ==================== 已投递职位 ====================
 
+    def _load_applied_jobs(self) -> Dict[str, Dict[str, Any]]:
+        """加载已投递职位详情到内存缓存（快照 + 追加日志）"""
+        if self._applied_jobs is None:
+            applied = self._load_json(self.applied_jobs_file) or {}
+            applied.update(self._read_applied_log())
+            self._applied_jobs = applied
+        return self._applied_jobs
+
+    def _read_applied_log(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """读取追加日志中的 (job_id, 职位信息)，同一职位后出现的记录覆盖先出现的"""
+        try:
+            data = self.applied_jobs_log.read_bytes()
+        except FileNotFoundError:
+            data = b''
+        # 批量模式下尚未写入的记录也要计入（例如批量中途重建布隆过滤器）
+        if self._pending_log:
+            data += b'\n' + b''.join(self._pending_log)
+
+        entries = []
+        for line in data.splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = _json_loads(line)
+            except ValueError:
+                # 写入中途退出留下的不完整行
+                continue
+            entries.append((entry['id'], entry['info']))
+        return entries
+
+    def _append_applied_log(self, lines: bytes) -> None:
+        """向追加日志写入若干行（一次 write）；批量模式下推迟到 flush"""
+        if self.buffered:
+            self._pending_log.append(lines)
+            return
+        with open(self.applied_jobs_log, 'a+b') as f:
+            # 上次写入中途退出时末尾可能缺少换行，先补上，避免与新记录粘连
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    lines = b'\n' + lines
+            f.write(lines)
+
+    def _write_applied_records(self, records: Dict[str, Dict[str, Any]]) -> None:
+        """记录若干职位的最新信息：更新已加载的缓存，并追加到日志"""
+        if self._applied_jobs is not None:
+            self._applied_jobs.update(records)
+        self._append_applied_log(b''.join(
+            _json_line({'id': job_id, 'info': info}) for job_id, info in records.items()
+        ))
+        self._maybe_compact_applied_log()
+
+    def _maybe_compact_applied_log(self) -> None:
+        """追加日志过大时合并进快照并删除日志"""
+        if self.buffered:
+            return
+        try:
+            log_size = self.applied_jobs_log.stat().st_size
+        except FileNotFoundError:
+            return
+        _, snapshot_size, _ = self._applied_jobs_fingerprint()
+        if log_size < max(LOG_COMPACT_MIN_SIZE, snapshot_size):
+            return
+
+        # 先原子写入快照再删除日志；中途退出时日志重放到新快照上结果不变
+        self._save_json(self.applied_jobs_file, self._load_applied_jobs())
+        self.applied_jobs_log.unlink()
+        if self._applied_bloom is not None:
+            self._save_applied_bloom()
+
+    def _scan_applied_job_ids(self) -> Optional[set]:
+        """
+        只扫描出已投递文件中的 job_id，不构建完整字典
+
+        Returns:
+            job_id 集合；文件格式不符合预期（如被手动压缩成一行）时返回 None
+        """
+        try:
+            size = self.applied_jobs_file.stat().st_size
+        except FileNotFoundError:
+            return {job_id for job_id, _ in self._read_applied_log()}
+
+        with open(self.applied_jobs_file, 'rb') as f:
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    keys = _RE_TOP_LEVEL_KEY.findall(data)
+            else:
+                keys = _RE_TOP_LEVEL_KEY.findall(f.read())
+
+        # 文件不是空字典却没有找到任何键，说明格式与预期不符
+        if not keys and size > len(b'{}'):
+            return None
+        # 含转义字符的键交给 json 解码
+        job_ids = {json.loads(b'"' + key + b'"') if b'\\' in key else key.decode('utf-8') for key in keys}
+        job_ids.update(job_id for job_id, _ in self._read_applied_log())
+        return job_ids
+
     def _load_applied_job_ids(self) -> set:
-        """加载已投递职位 ID 到内存缓存"""
+        """加载已投递职位 ID 到内存缓存（已加载详情时直接取键，否则只扫描 job_id）"""
         if self._applied_job_ids is None:
-            applied = self._load_json(self.applied_jobs_file) or {}
-            self._applied_job_ids = set(applied.keys())
+            job_ids = self._scan_applied_job_ids() if self._applied_jobs is None else None
+            self._applied_job_ids = job_ids if job_ids is not None else set(self._load_applied_jobs())
         return self._applied_job_ids
 
+    def load_applied_ids(self) -> set:
+        """获取已投递职位 ID 集合（内存缓存，批量添加时同步更新）"""
+        return self._load_applied_job_ids()
+
     def get_applied_jobs(self) -> Dict[str, Dict[str, Any]]:
-        """获取所有已投递职位详情（用于统计等场景）"""
-        return self._load_json(self.applied_jobs_file) or {}
+        """获取所有已投递职位详情（用于统计等场景，返回内存缓存，请勿直接修改）"""
+        return self._load_applied_jobs()
+
+    def _applied_jobs_fingerprint(self) -> Tuple[int, int, int]:
+        """已投递快照的 (修改时间, 大小) 和追加日志的大小，用于校验布隆过滤器是否与之同步"""
+        try:
+            stat = self.applied_jobs_file.stat()
+            mtime_ns, size = stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            mtime_ns, size = 0, 0
+        try:
+            log_size = self.applied_jobs_log.stat().st_size
+        except FileNotFoundError:
+            log_size = 0
+        return mtime_ns, size, log_size
+
+    def _load_applied_bloom(self) -> BloomFilter:
+        """加载已投递布隆过滤器，文件缺失或与已投递文件不同步时重建"""
+        if self._applied_bloom is None:
+            fingerprint = _FINGERPRINT.pack(*self._applied_jobs_fingerprint())
+            bloom = None
+
+            try:
+                data = self.applied_bloom_file.read_bytes()
+            except FileNotFoundError:
+                data = b''
+            if data[:len(fingerprint)] == fingerprint:
+                try:
+                    bloom = BloomFilter.from_bytes(data[len(fingerprint):])
+                except ValueError:
+                    bloom = None
+
+            if bloom is not None and bloom.fill_ratio() <= APPLIED_BLOOM_MAX_FILL:
+                self._applied_bloom = bloom
+            else:
+                self._rebuild_applied_bloom()
+        return self._applied_bloom
+
+    def _rebuild_applied_bloom(self) -> None:
+        """按当前已投递数量重建布隆过滤器（预留一倍余量）并保存"""
+        job_ids = self._load_applied_job_ids()
+        bloom = BloomFilter(
+            capacity=max(APPLIED_BLOOM_MIN_CAPACITY, len(job_ids) * 2),
+            error_rate=APPLIED_BLOOM_ERROR_RATE
+        )
+        for job_id in job_ids:
+            bloom.add(job_id)
+        self._applied_bloom = bloom
+        self._save_applied_bloom()
+
+    def _save_applied_bloom(self) -> None:
+        """保存布隆过滤器，并记录对应的已投递文件指纹"""
+        if self.buffered:
+            self._bloom_dirty = True
+            return
+        fingerprint = _FINGERPRINT.pack(*self._applied_jobs_fingerprint())
+        self._write_atomic(self.applied_bloom_file, fingerprint + self._applied_bloom.to_bytes())
 
     def is_job_applied(self, job_id: str) -> bool:
-        """检查职位是否已投递（使用内存缓存，O(1) 查询）"""
+        """检查职位是否已投递（布隆过滤器未命中直接返回，命中后再查内存缓存）"""
+        if job_id not in self._load_applied_bloom():
+            return False
         return job_id in self._load_applied_job_ids()
 
     def add_applied_job(self, job_id: str, job_info: Dict[str, Any]) -> None:
         """添加已投递职位"""
-        applied = self.get_applied_jobs()
-        applied[job_id] = {
-            **job_info,
-            'apply_time': datetime.now().isoformat(),
-            'status': 'applied'
-        }
-        self._save_json(self.applied_jobs_file, applied)
+        self.add_applied_jobs({job_id: job_info})
+
+    def add_applied_jobs(self, jobs: Dict[str, Dict[str, Any]], status: str = 'applied') -> None:
+        """
+        批量添加已投递职位（只向追加日志写入一次，无需读取已有记录）
+
+        Args:
+            jobs: job_id -> 职位信息
+            status: 记录状态，详情页显示已沟通过的职位记为 contacted
+        """
+        if not jobs:
+            return
+
+        bloom = self._load_applied_bloom()
+        apply_time = datetime.now().isoformat()
+        records = {}
+        for job_id, job_info in jobs.items():
+            # 复制一次后就地补充字段，缓存不引用调用方的 dict
+            record = dict(job_info)
+            record.setdefault('apply_time', apply_time)
+            record['status'] = status
+            records[job_id] = record
+        self._write_applied_records(records)
         # 同步更新缓存
         if self._applied_job_ids is not None:
-            self._applied_job_ids.add(job_id)
+            self._applied_job_ids.update(jobs)
+        for job_id in jobs:
+            bloom.add(job_id)
+        if bloom.fill_ratio() > APPLIED_BLOOM_MAX_FILL:
+            self._rebuild_applied_bloom()
+        else:
+            self._save_applied_bloom()
 
     def update_job_status(self, job_id: str, status: str) -> None:
         """更新职位状态（applied/read/replied）"""
-        applied = self.get_applied_jobs()
-        if job_id in applied:
-            applied[job_id]['status'] = status
-            applied[job_id]['update_time'] = datetime.now().isoformat()
-            self._save_json(self.applied_jobs_file, applied)
+        record = self._load_applied_jobs().get(job_id)
+        if record is not None:
+            record['status'] = status
+            record['update_time'] = datetime.now().isoformat()
+            self._write_applied_records({job_id: record})
 
     # ==================== 黑名单 ====================
 
-    def _load_blacklist_cache(self) -> Dict[str, set]:
+    def _load_blacklist(self) -> None:
         """加载黑名单到内存缓存"""
-        if self._blacklist_cache is None:
-            data = self._load_json(self.blacklist_file) or {'companies': [], 'hr_ids': []}
-            self._blacklist_cache = {
-                'companies': set(data.get('companies', [])),
-                'hr_ids': set(data.get('hr_ids', []))
-            }
-        return self._blacklist_cache
+        data = self._load_json(self.blacklist_file) or {}
+        self._blacklist_companies = frozenset(data.get('companies', []))
+        self._blacklist_hr_ids = frozenset(data.get('hr_ids', []))
 
     def get_blacklist(self) -> Dict[str, List[str]]:
         """获取黑名单（返回列表格式，兼容旧接口）"""
-        cache = self._load_blacklist_cache()
         return {
-            'companies': list(cache['companies']),
-            'hr_ids': list(cache['hr_ids'])
+            'companies': list(self.get_company_blacklist()),
+            'hr_ids': list(self.get_hr_blacklist())
         }
 
+    def get_company_blacklist(self) -> frozenset:
+        """获取黑名单公司（不可变集合，可直接用于批量过滤）"""
+        if self._blacklist_companies is None:
+            self._load_blacklist()
+        return self._blacklist_companies
+
+    def get_hr_blacklist(self) -> frozenset:
+        """获取黑名单 HR（不可变集合）"""
+        if self._blacklist_hr_ids is None:
+            self._load_blacklist()
+        return self._blacklist_hr_ids
+
     def is_company_blacklisted(self, company: str) -> bool:
         """检查公司是否在黑名单（使用内存缓存）"""
-        return company in self._load_blacklist_cache()['companies']
+        return company in self.get_company_blacklist()
 
     def add_company_to_blacklist(self, company: str) -> None:
         """添加公司到黑名单"""
-        cache = self._load_blacklist_cache()
-        if company not in cache['companies']:
-            cache['companies'].add(company)
+        if company not in self.get_company_blacklist():
+            self._blacklist_companies = self._blacklist_companies | {company}
             # 保存到文件
             self._save_json(self.blacklist_file, self.get_blacklist())
 
     def is_hr_blacklisted(self, hr_id: str) -> bool:
         """检查 HR 是否在黑名单（使用内存缓存）"""
-        return hr_id in self._load_blacklist_cache()['hr_ids']
+        return hr_id in self.get_hr_blacklist()
 
     def add_hr_to_blacklist(self, hr_id: str) -> None:
         """添加 HR 到黑名单"""
-        cache = self._load_blacklist_cache()
-        if hr_id not in cache['hr_ids']:
-            cache['hr_ids'].add(hr_id)
+        if hr_id not in self.get_hr_blacklist():
+            self._blacklist_hr_ids = self._blacklist_hr_ids | {hr_id}
             self._save_json(self.blacklist_file, self.get_blacklist())
 
     # ==================== HR 记录 ====================
 
     def get_hr_records(self) -> Dict[str, Dict[str, Any]]:
-        """获取 HR 响应记录"""
-        return self._load_json(self.hr_records_file) or {}
+        """获取 HR 响应记录（内存缓存）"""
+        if self._hr_records is None:
+            self._hr_records = self._load_json(self.hr_records_file) or {}
+        return self._hr_records
 
     def record_hr_contact(self, hr_id: str, hr_info: Dict[str, Any]) -> None:
         """记录 HR 联系"""
         records = self.get_hr_records()
+        now = datetime.now()
+        contact_time = now.isoformat()
         if hr_id not in records:
             records[hr_id] = {
                 **hr_info,
-                'first_contact': datetime.now().isoformat(),
+                'first_contact': contact_time,
                 'contact_count': 0,
                 'replied': False
             }
         records[hr_id]['contact_count'] += 1
-        records[hr_id]['last_contact'] = datetime.now().isoformat()
+        records[hr_id]['last_contact'] = contact_time
+        if self._hr_contact_index is not None:
+            # 索引已建立时所有 HR 的时间都已解析，移除旧位置后按新时间插入
+            previous = self._hr_last_contact.get(hr_id)
+            if previous is not None:
+                index = self._hr_contact_index
+                del index[bisect.bisect_left(index, (previous, hr_id))]
+            bisect.insort(self._hr_contact_index, (now, hr_id))
+        self._hr_last_contact[hr_id] = now
         self._save_json(self.hr_records_file, records)
 
     def mark_hr_replied(self, hr_id: str) -> None:
@@ -144,40 +485,110 @@ class Storage:
             records[hr_id]['reply_time'] = datetime.now().isoformat()
             self._save_json(self.hr_records_file, records)
 
-    def is_hr_no_reply(self, hr_id: str, days: int = 7) -> bool:
-        """检查 HR 是否已读不回（超过指定天数未回复）"""
-        records = self.get_hr_records()
-        if hr_id not in records:
+    def is_hr_no_reply(self, hr_id: str, days: int = 7, now: Optional[datetime] = None) -> bool:
+        """
+        检查 HR 是否已读不回（超过指定天数未回复）
+
+        Args:
+            hr_id: HR ID
+            days: 未回复天数阈值
+            now: 当前时间，批量检查时由调用方传入同一个值
+        """
+        record = self.get_hr_records().get(hr_id)
+        if record is None or record.get('replied') or 'last_contact' not in record:
             return False
+        return ((now or datetime.now()) - self._get_hr_last_contact(hr_id, record)).days >= days
 
-        record = records[hr_id]
-        if record.get('replied'):
-            return False
+    def get_no_reply_hrs(self, days: int = 7, now: Optional[datetime] = None) -> List[str]:
+        """
+        获取所有已读不回的 HR（超过指定天数未回复），按最后联系时间从早到晚排列
+
+        Args:
+            days: 未回复天数阈值
+            now: 当前时间
 
-        last_contact = datetime.fromisoformat(record.get('last_contact', datetime.now().isoformat()))
-        return (datetime.now() - last_contact).days >= days
+        Returns:
+            HR ID 列表
+        """
+        records = self.get_hr_records()
+        if self._hr_contact_index is None:
+            self._hr_contact_index = sorted(
+                (self._get_hr_last_contact(hr_id, record), hr_id)
+                for hr_id, record in records.items() if 'last_contact' in record
+            )
+
+        # 与 is_hr_no_reply 一致：相差整天数 >= days 即最后联系时间 <= now - days
+        cutoff = (now or datetime.now()) - timedelta(days=days)
+        index = self._hr_contact_index
+        # 哨兵 ID 大于任何实际 HR ID，使时间等于 cutoff 的记录全部落在左侧
+        end = bisect.bisect_right(index, (cutoff, '\U0010ffff'))
+        return [hr_id for _, hr_id in index[:end] if not records[hr_id].get('replied')]
+
+    def _get_hr_last_contact(self, hr_id: str, record: Dict[str, Any]) -> datetime:
+        """HR 最后联系时间（解析结果缓存）"""
+        last_contact = self._hr_last_contact.get(hr_id)
+        if last_contact is None:
+            last_contact = self._hr_last_contact[hr_id] = datetime.fromisoformat(record['last_contact'])
+        return last_contact
 
     # ==================== 每日统计 ====================
 
     def get_daily_stats(self) -> Dict[str, Dict[str, int]]:
-        """获取每日统计"""
-        return self._load_json(self.daily_stats_file) or {}
+        """获取每日统计（内存缓存，合并今日计数文件）"""
+        if self._daily_stats is None:
+            self._daily_stats = self._load_json(self.daily_stats_file) or {}
+            self._fold_today_count()
+        return self._daily_stats
+
+    def _fold_today_count(self) -> None:
+        """
+        把今日计数文件合并进每日统计；计数文件属于之前某天时写回每日统计并删除
+
+        计数文件对它所记录的那一天是权威的：每次计数都从每日统计中的该行累加后写入计数文件，
+        而每日统计只在跨天或合并时才写入该行，因此每日统计中的值只可能落后，直接以计数文件为准。
+        """
+        try:
+            day, count = self.today_count_file.read_text(encoding='utf-8').split()
+            count = int(count)
+        except (FileNotFoundError, ValueError):
+            return
+
+        self._daily_stats.setdefault(day, {})['apply_count'] = count
+        if day != date.today().isoformat():
+            # 确认每日统计写入后才删除计数文件；批量模式下写入推迟，删除也推迟到 flush
+            self._save_json(self.daily_stats_file, self._daily_stats)
+            if self.buffered:
+                self._today_count_stale = True
+            else:
+                self.today_count_file.unlink(missing_ok=True)
+
+    def _save_today_count(self) -> None:
+        """写入今日计数文件（批量模式下推迟到 flush）"""
+        if self.buffered:
+            self._today_count_dirty = True
+            return
+        content = f"{self._today.isoformat()} {self._today_row['apply_count']}"
+        self._write_atomic(self.today_count_file, content.encode('utf-8'))
+
+    def _today_stats(self) -> Dict[str, int]:
+        """今日统计行（缓存引用，只在日期变化时重新查找）"""
+        today = date.today()
+        if today != self._today:
+            stats = self.get_daily_stats()
+            if self._today is not None:
+                # 跨天：前一天的计数只在计数文件中，覆盖前先写回每日统计
+                self._save_json(self.daily_stats_file, stats)
+            self._today_row = stats.setdefault(today.isoformat(), {'apply_count': 0})
+            self._today = today
+        return self._today_row
 
     def get_today_apply_count(self) -> int:
         """获取今日投递数量"""
-        stats = self.get_daily_stats()
-        today = date.today().isoformat()
-        return stats.get(today, {}).get('apply_count', 0)
+        return self._today_stats()['apply_count']
 
-    def increment_today_apply_count(self) -> int:
+    def increment_today_apply_count(self, count: int = 1) -> int:
         """增加今日投递计数，返回当前计数"""
-        stats = self.get_daily_stats()
-        today = date.today().isoformat()
-
-        if today not in stats:
-            stats[today] = {'apply_count': 0}
-
-        stats[today]['apply_count'] += 1
-        self._save_json(self.daily_stats_file, stats)
-
-        return stats[today]['apply_count']
+        row = self._today_stats()
+        row['apply_count'] += count
+        self._save_today_count()
+        return row['apply_count']